@@ -0,0 +1,64 @@
+import argparse
+import json
+
+# ----------------------------
+# Benchmark Comparison
+# ----------------------------
+# Prints median timings and quality metrics from two benchmark JSON files
+# side by side, matched by workload name. Quality regressions are flagged so
+# a speed-up that changes the schedules is easy to spot.
+
+QUALITY_KEYS = ['unfilled_slots', 'shortfall', 'total_violations', 'location_hit_rate', 'shift_hit_rate']
+
+def by_name(report):
+    return {result['workload']['name']: result for result in report['results']}
+
+def timing_rows(before, after):
+    phases = list(before['timings'])
+    if before.get('end_to_end') and after.get('end_to_end'):
+        phases.append('run_scheduler')
+    for phase in phases:
+        if phase == 'run_scheduler':
+            old = before['end_to_end']['run_scheduler']['median']
+            new = after['end_to_end']['run_scheduler']['median']
+        elif phase in after['timings']:
+            old = before['timings'][phase]['median']
+            new = after['timings'][phase]['median']
+        else:
+            continue
+        speedup = old / new if new else float('inf')
+        yield f"  {phase:<20} {old:>10.4f}s {new:>10.4f}s   x{speedup:.2f}"
+
+def quality_rows(before, after):
+    for key in QUALITY_KEYS:
+        old, new = before['quality'][key], after['quality'][key]
+        worse = new < old if key.endswith('hit_rate') else new > old
+        flag = '  <-- worse' if worse else ''
+        yield f"  {key:<20} {old:>11.4g} {new:>11.4g}{flag}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta']['commit']} {before['meta']['label'] or ''}")
+    print(f"after:  {after['meta']['commit']} {after['meta']['label'] or ''}")
+    old_results, new_results = by_name(before), by_name(after)
+    for name, old in old_results.items():
+        new = new_results.get(name)
+        if new is None:
+            continue
+        print(f"\n{name}: {old['workload']}")
+        for row in timing_rows(old, new):
+            print(row)
+        for row in quality_rows(old, new):
+            print(row)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import budget per entry point, in seconds of import time on a cold
+# interpreter. Generous enough for a slow CI box; a regression that pulls a
+# heavy package into an entry point still trips them.
+BUDGETS = {
+    'app': 1.5,
+    'setup': 1.5,
+    'schedule': 1.5,
+    'engine': 1.0,
+    'cli': 1.0
+}
+
+# Modules an entry point must not load at import time
+FORBIDDEN = {
+    'app': ('faker', 'seaborn', 'matplotlib', 'modules.scheduler_engine'),
+    'setup': ('faker', 'seaborn', 'matplotlib', 'modules.scheduler_engine'),
+    'schedule': ('faker', 'seaborn', 'matplotlib', 'modules.scheduler_engine'),
+    'engine': ('streamlit', 'faker', 'seaborn', 'matplotlib'),
+    'cli': ('streamlit', 'faker', 'seaborn', 'matplotlib')
+}
+
+# ----------------------------
+# Import-time Benchmark
+# ----------------------------
+# Measures what each entry point costs to import, using the interpreter's
+# own -X importtime report, in a fresh process per sample:
+#
+#   python -m benchmarks.imports
+#   python -m benchmarks.imports --entry cli --budget cli=0.5 --out imports.json
+#
+# The app and the pages are measured by running their top-level import
+# statements, which is what a first page load pays before the script body
+# runs. Modules the bare interpreter already imports at startup are left
+# out. Exits with status 1 when an entry point goes over its budget or
+# loads one of its FORBIDDEN modules.
+
+def page_imports(path):
+    with open(os.path.join(ROOT, path)) as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def entry_points():
+    return {
+        'app': page_imports('app.py'),
+        'setup': page_imports(os.path.join('pages', '1_Setup.py')),
+        'schedule': page_imports(os.path.join('pages', '2_Schedule.py')),
+        'engine': 'import modules.scheduler_engine',
+        'cli': 'import scheduleme.__main__'
+    }
+
+def import_report(code):
+    # [(name, depth, self_us, cumulative_us), ...] in import order
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode:
+        raise RuntimeError(f"import failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        self_us, cumulative_us, field = line[len('import time:'):].split('|')
+        name = field.strip()
+        depth = (len(field) - len(field.lstrip()) - 1) // 2
+        rows.append((name, depth, int(self_us), int(cumulative_us)))
+    return rows
+
+def measure(code, baseline, repeat=5, top=10):
+    samples = []
+    modules = {}
+    for _ in range(repeat):
+        rows = [row for row in import_report(code) if row[0] not in baseline]
+        samples.append(sum(cumulative for _, depth, _, cumulative in rows if depth == 0) / 1e6)
+        for name, _, self_us, _ in rows:
+            modules.setdefault(name, []).append(self_us)
+    slowest = sorted(((statistics.median(us) / 1e6, name) for name, us in modules.items()), reverse=True)
+    return {
+        'seconds': statistics.median(samples),
+        'samples': samples,
+        'modules': sorted(modules),
+        'slowest': [{'module': name, 'self_seconds': seconds} for seconds, name in slowest[:top]]
+    }
+
+def parse_budget(text):
+    key, _, value = text.partition('=')
+    return key, float(value)
+
+def main(argv=None):
+    entries = entry_points()
+    parser = argparse.ArgumentParser(description="Measure and budget import time of each entry point.")
+    parser.add_argument('--entry', nargs='+', choices=sorted(entries), default=sorted(entries))
+    parser.add_argument('--repeat', type=int, default=5, help="fresh-interpreter samples per entry point")
+    parser.add_argument('--budget', action='append', default=[], type=parse_budget, metavar='ENTRY=SECONDS',
+                        help="override an entry point's budget (repeatable)")
+    parser.add_argument('--top', type=int, default=5, help="slowest modules to list per entry point")
+    parser.add_argument('--out', help="write JSON results to this file")
+    args = parser.parse_args(argv)
+    budgets = dict(BUDGETS, **dict(args.budget))
+
+    baseline = {name for name, *_ in import_report('pass')}
+    # One throwaway run so bytecode compilation is not timed
+    for name in args.entry:
+        import_report(entries[name])
+
+    results = {}
+    failed = []
+    for name in args.entry:
+        result = measure(entries[name], baseline, args.repeat, args.top)
+        result['budget'] = budgets[name]
+        result['forbidden'] = [mod for mod in FORBIDDEN.get(name, ()) if mod in result['modules']]
+        result['ok'] = result['seconds'] <= result['budget'] and not result['forbidden']
+        results[name] = result
+        if not result['ok']:
+            failed.append(name)
+
+        slowest = ', '.join(f"{row['module']} {row['self_seconds'] * 1000:.0f}ms" for row in result['slowest'])
+        line = (
+            f"{name:>9}  {result['seconds']:.3f}s / {result['budget']:.3f}s budget  "
+            f"{'ok' if result['ok'] else 'FAIL'} | {slowest}"
+        )
+        if result['forbidden']:
+            line += f" | forbidden: {', '.join(result['forbidden'])}"
+        print(line, flush=True)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+    if failed:
+        sys.exit(1)
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from modules import db_manager
+from modules import scheduler_engine
+from modules.config import DEFAULT_RULES, parse_rule
+from modules.diagnostics import RunProfile
+from modules.eligibility import EligibilityIndex
+from modules.quality import evaluate_schedule
+from modules.schedule_state import ScheduleState
+from benchmarks.workloads import PRESETS, make_workload
+
+# ----------------------------
+# Benchmark Runner
+# ----------------------------
+# Times each scheduler phase on synthetic workloads and scores the result,
+# so runs from different commits can be compared side by side:
+#
+#   python -m benchmarks.run --preset small medium --out before.json
+#   python -m benchmarks.run --preset small medium --out after.json
+#   python -m benchmarks.compare before.json after.json
+#
+# Timings are the wall time of each repeat; peak memory comes from a
+# separate tracemalloc pass so tracing overhead never leaks into timings.
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except Exception:
+        return None
+
+def summarize(samples):
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'max': max(samples),
+        'samples': samples
+    }
+
+def run_phases(workload, profile=None):
+    roster = workload['roster']
+    rules = workload['rules']
+    schedule_days = workload['schedule_days']
+    timings = {}
+
+    start = time.perf_counter()
+    eligibility = EligibilityIndex(
+        roster, schedule_days, rules['shift_types'], rules['active_locations'], rules, lookahead=True
+    )
+    timings['index_build'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schedule = scheduler_engine.generate_schedule(
+        roster, schedule_days, rules['shift_types'], rules['active_locations'], eligibility, ScheduleState(),
+        profile=profile, config=rules
+    )
+    timings['generate_schedule'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scheduler_engine.fill_schedule_gaps(
+        schedule, roster, schedule_days, rules['shift_types'], rules['active_locations'], eligibility,
+        profile=profile, config=rules
+    )
+    timings['fill_schedule_gaps'] = time.perf_counter() - start
+    return schedule, timings
+
+def run_end_to_end(workload, workers, solver, time_limit):
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            with db_manager.use_data_dir(tmp), db_manager.use_session('benchmark'):
+                db_manager.save_employees(workload['employees'])
+                start = time.perf_counter()
+                scheduler_engine.run_scheduler(
+                    workload['rules'], solver=solver, time_limit=time_limit, workers=workers, use_cache=False
+                )
+                elapsed = time.perf_counter() - start
+                schedule = ScheduleState.from_dataframe(db_manager.load_schedule())
+        finally:
+            db_manager.clear_cache()
+
+    first = min((date for (_, date) in schedule.keys()), default=datetime.today())
+    schedule_days = [first + timedelta(days=k) for k in range(workload['rules']['schedule_days'])]
+    return schedule, schedule_days, elapsed
+
+def run_workload(workload, args):
+    rules = workload['rules']
+    samples = {}
+    for _ in range(args.repeat):
+        schedule, timings = run_phases(workload)
+        for phase, elapsed in timings.items():
+            samples.setdefault(phase, []).append(elapsed)
+    quality = evaluate_schedule(
+        schedule, workload['roster'], workload['schedule_days'],
+        rules['shift_types'], rules['active_locations'], rules
+    )
+
+    peak_memory = None
+    if not args.no_memory:
+        tracemalloc.start()
+        run_phases(workload)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    # Rejection counts only; the profiled pass is slower, so its times are not used
+    rejections = None
+    if args.profile:
+        profile = RunProfile()
+        run_phases(workload, profile)
+        rejections = {name: stats['rejections'] for name, stats in profile.phases.items()}
+
+    end_to_end = None
+    if not args.no_end_to_end:
+        e2e_samples = []
+        for _ in range(args.repeat):
+            e2e_schedule, e2e_days, elapsed = run_end_to_end(workload, args.workers, args.solver, args.time_limit)
+            e2e_samples.append(elapsed)
+        end_to_end = {
+            'run_scheduler': summarize(e2e_samples),
+            'quality': evaluate_schedule(
+                e2e_schedule, workload['roster'], e2e_days,
+                rules['shift_types'], rules['active_locations'], rules
+            )
+        }
+
+    return {
+        'workload': workload['params'],
+        'timings': {phase: summarize(values) for phase, values in samples.items()},
+        'peak_memory_bytes': peak_memory,
+        'quality': quality,
+        'rejections': rejections,
+        'end_to_end': end_to_end
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on synthetic rosters.")
+    parser.add_argument('--preset', nargs='+', choices=sorted(PRESETS), default=[],
+                        help="named workload sizes to run")
+    parser.add_argument('--employees', type=int, help="custom workload: number of employees")
+    parser.add_argument('--days', type=int, default=7, help="custom workload: days in the horizon")
+    parser.add_argument('--locations', type=int, default=3, help="custom workload: number of locations")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="timed repeats per phase")
+    parser.add_argument('--rule', action='append', default=[], metavar='KEY=VALUE',
+                        help="override a scheduler rule, value parsed as JSON (repeatable)")
+    parser.add_argument('--solver', choices=scheduler_engine.SOLVERS, default='greedy',
+                        help="solver for the end-to-end run")
+    parser.add_argument('--time-limit', type=int, default=30, help="MILP time limit in seconds")
+    parser.add_argument('--workers', type=int, default=1, help="parallel workers for the end-to-end run")
+    parser.add_argument('--storage', choices=('sqlite', 'parquet'), default='sqlite',
+                        help="db_manager storage backend for the end-to-end run")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--profile', action='store_true', help="record per-rule rejection counts")
+    parser.add_argument('--no-end-to-end', action='store_true', help="skip timing run_scheduler")
+    parser.add_argument('--label', help="free-form label stored with the results")
+    parser.add_argument('--out', help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    sizes = [dict(PRESETS[name], name=name) for name in args.preset]
+    if args.employees:
+        sizes.append({'name': 'custom', 'employees': args.employees, 'days': args.days, 'locations': args.locations})
+    if not sizes:
+        sizes = [dict(PRESETS['small'], name='small')]
+
+    try:
+        overrides = dict(parse_rule(text) for text in args.rule)
+    except ValueError as e:
+        parser.error(f"bad rules: {e}")
+    base_rules = dict(DEFAULT_RULES, **overrides)
+    db_manager.STORAGE = args.storage
+
+    results = []
+    for size in sizes:
+        workload = make_workload(size['employees'], size['days'], size['locations'], seed=args.seed, rules=base_rules)
+        workload['params']['name'] = size['name']
+        result = run_workload(workload, args)
+        results.append(result)
+
+        timings = result['timings']
+        quality = result['quality']
+        line = (
+            f"{size['name']:>8}  {size['employees']:>6} emp {size['days']:>3} days {size['locations']:>3} loc | "
+            f"index {timings['index_build']['median']:.3f}s  generate {timings['generate_schedule']['median']:.3f}s  "
+            f"fill {timings['fill_schedule_gaps']['median']:.3f}s"
+        )
+        if result['end_to_end']:
+            line += f"  run_scheduler {result['end_to_end']['run_scheduler']['median']:.3f}s"
+        if result['peak_memory_bytes'] is not None:
+            line += f"  peak {result['peak_memory_bytes'] / 2 ** 20:.1f} MiB"
+        line += (
+            f" | unfilled {quality['unfilled_slots']}  violations {quality['total_violations']}"
+            f"  loc hit {quality['location_hit_rate']:.1%}  shift hit {quality['shift_hit_rate']:.1%}"
+        )
+        print(line, flush=True)
+
+    report = {
+        'meta': {
+            'label': args.label,
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'solver': args.solver,
+            'workers': args.workers,
+            'storage': args.storage,
+            'rule_overrides': overrides
+        },
+        'results': results
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
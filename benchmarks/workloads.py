@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from modules.config import SchedulerConfig
+from modules.roster import Roster
+
+# ----------------------------
+# Synthetic Workloads
+# ----------------------------
+# Seeded, in-memory rosters for benchmarking. Unlike generate_employees this
+# never touches Faker or the database, so it scales to tens of thousands of
+# employees in a few seconds, and the same seed always produces the same
+# roster on any machine.
+
+PRESETS = {
+    'small':  {'employees': 100,   'days': 7,  'locations': 3},
+    'medium': {'employees': 1000,  'days': 30, 'locations': 10},
+    'large':  {'employees': 10000, 'days': 60, 'locations': 25},
+    'xl':     {'employees': 50000, 'days': 90, 'locations': 50}
+}
+
+SHIFT_TYPES = ['Morning', 'Afternoon', 'Night']
+WORK_PATTERNS = [
+    ["Friday", "Saturday", "Sunday", "Monday", "Tuesday"],
+    ["Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+    ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"],
+    ["Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+]
+SKILL_LEVELS = ["Tech1", "Tech2", "Tech3"]
+
+def zone_names(n):
+    width = len(str(n))
+    return [f"Zone{i + 1:0{width}d}" for i in range(n)]
+
+def build_roster(employees, days, locations, seed=42, start=None):
+    rng = np.random.default_rng(seed)
+    start = start or datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
+    zones = zone_names(locations)
+    shift_choices = [[shift] for shift in SHIFT_TYPES] + [SHIFT_TYPES]
+
+    hired = rng.integers(30, 1000, size=employees)
+    patterns = rng.integers(0, len(WORK_PATTERNS), size=employees)
+    skills = rng.integers(0, len(SKILL_LEVELS), size=employees)
+    # Most staff prefer one or two zones, spread evenly across the map
+    home = rng.integers(0, locations, size=employees)
+    second = np.where(rng.random(employees) < 0.5, rng.integers(0, locations, size=employees), home)
+    shifts = rng.integers(0, len(shift_choices), size=employees)
+    n_unavailable = rng.integers(1, 4, size=employees)
+    unavailable = rng.integers(0, days, size=(employees, 3))
+
+    dates = [(start + timedelta(days=k)).strftime('%Y-%m-%d') for k in range(days)]
+    df = pd.DataFrame({
+        'EmployeeID': [f"E{i:06d}" for i in range(employees)],
+        'Name': [f"Employee {i:06d}" for i in range(employees)],
+        'PhoneNumber': [f"555-{i // 10000:03d}-{i % 10000:04d}" for i in range(employees)],
+        'DateHired': [(start - timedelta(days=int(d))).strftime('%Y-%m-%d') for d in hired],
+        'WorkPattern': [WORK_PATTERNS[p] for p in patterns],
+        'PreferredLocations': [
+            [zones[a]] if a == b else [zones[a], zones[b]] for a, b in zip(home, second)
+        ],
+        'PreferredShifts': [shift_choices[s] for s in shifts],
+        'SkillLevel': [SKILL_LEVELS[s] for s in skills],
+        'UnavailableDates': [
+            sorted({dates[d] for d in row[:k]}) for row, k in zip(unavailable, n_unavailable)
+        ]
+    })
+    return df
+
+def make_workload(employees, days, locations, seed=42, rules=None, start=None):
+    start = start or datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
+    df = build_roster(employees, days, locations, seed=seed, start=start)
+    rules = dict(rules or {})
+    rules.update({
+        'schedule_days': days,
+        'active_locations': zone_names(locations),
+        'shift_types': list(SHIFT_TYPES),
+        'holiday_dates': list(rules.get('holiday_dates', []))
+    })
+    # Without the rolling horizon the shift cap applies to the whole
+    # horizon, so scale it with the number of weeks to keep long horizons
+    # staffable
+    if not rules.get('rolling_horizon'):
+        rules['max_shifts_per_employee'] = rules.get('max_shifts_per_employee', 5) * -(-days // 7)
+    return {
+        'employees': df,
+        'roster': Roster.from_dataframe(df),
+        'schedule_days': [start + timedelta(days=k) for k in range(days)],
+        'rules': SchedulerConfig(**rules),
+        'params': {'employees': employees, 'days': days, 'locations': locations, 'seed': seed}
+    }
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from modules.roster import as_roster
+from modules.skills import required_skills, slot_requirements
+
+# ----------------------------
+# Schedule Analytics
+# ----------------------------
+# Everything the Schedule page shows about a saved schedule, computed in one
+# pass over the schedule frame. Dates, locations, shifts and employees are
+# turned into integer codes once; coverage is a bincount over the flattened
+# (day, location, shift) codes and per-employee counts and preference hits
+# are bincounts over employee codes, so the cost is linear in the number of
+# assignments and never scans the schedule per employee or per cell.
+#
+# The coverage grid spans schedule_days from the first scheduled date and
+# every active location, so slots nobody was placed in show up as zeros
+# instead of missing rows. Assignments outside the active locations or shift types
+# still count towards an employee's shifts but not towards coverage.
+#
+# The skill mix is the same bincount with the employee's SkillLevel folded
+# into the slot code, one column per skill next to the slot's headcount.
+
+def schedule_analytics(schedule_df, roster, rules):
+    roster = as_roster(roster)
+    locations = list(rules['active_locations'])
+    shift_types = list(rules['shift_types'])
+    min_staff = rules['min_staff_threshold']
+
+    dates = pd.to_datetime(schedule_df['Date']).dt.normalize()
+    start = dates.min() if len(dates) else pd.Timestamp.today().normalize()
+    day_code = (dates - start).dt.days.to_numpy(dtype=np.int64)
+    n_days = max(int(day_code.max()) + 1 if len(day_code) else 0, rules['schedule_days'])
+    horizon = pd.date_range(start, periods=n_days, freq='D')
+
+    loc_code = pd.Categorical(schedule_df['Location'], categories=locations).codes.astype(np.int64)
+    shift_code = pd.Categorical(schedule_df['Shift'], categories=shift_types).codes.astype(np.int64)
+    emp_code = pd.Categorical(schedule_df['EmployeeID'], categories=roster.ids).codes.astype(np.int64)
+
+    # Coverage: staff per (day, location, shift)
+    in_grid = (loc_code >= 0) & (shift_code >= 0)
+    n_slots = n_days * len(locations) * len(shift_types)
+    slot_code = (day_code * len(locations) + loc_code) * len(shift_types) + shift_code
+    counts = np.bincount(slot_code[in_grid], minlength=n_slots)
+    counts = counts.reshape(n_days * len(locations), len(shift_types))
+    coverage = pd.DataFrame(counts, columns=shift_types)
+    coverage.insert(0, 'Location', np.tile(locations, n_days))
+    coverage.insert(0, 'Date', np.repeat(horizon, len(locations)))
+
+    # Understaffed slots, holidays excluded
+    holidays = pd.to_datetime(list(rules['holiday_dates'])).normalize()
+    open_day = ~horizon.isin(holidays)
+    staffed = counts.reshape(n_days, len(locations), len(shift_types))
+    short = (staffed < min_staff) & open_day[:, None, None]
+    d, l, s = np.nonzero(short)
+    understaffed = pd.DataFrame({
+        'Date': horizon[d],
+        'Location': np.asarray(locations, dtype=object)[l],
+        'Shift': np.asarray(shift_types, dtype=object)[s],
+        'Staffed': staffed[d, l, s],
+        'Missing': min_staff - staffed[d, l, s]
+    })
+
+    # Skill mix: staff per (day, location, shift, skill)
+    known = emp_code >= 0
+    levels = np.array([e.skill_level for e in roster], dtype=object)
+    skills = sorted({lvl for lvl in levels if isinstance(lvl, str)} | set(required_skills(rules)))
+    emp_skill = pd.Categorical(levels, categories=skills).codes.astype(np.int64)
+    rows = in_grid & known
+    skill_code = emp_skill[emp_code[rows]]
+    skilled = skill_code >= 0
+    skill_counts = np.bincount(
+        slot_code[rows][skilled] * len(skills) + skill_code[skilled], minlength=n_slots * len(skills)
+    ).reshape(n_slots, len(skills))
+    skill_mix = pd.DataFrame(skill_counts, columns=skills)
+    skill_mix.insert(0, 'Staff', counts.reshape(-1))
+    skill_mix.insert(0, 'Shift', np.tile(shift_types, n_days * len(locations)))
+    skill_mix.insert(0, 'Location', np.tile(np.repeat(locations, len(shift_types)), n_days))
+    skill_mix.insert(0, 'Date', np.repeat(horizon, len(locations) * len(shift_types)))
+
+    # Slots missing a required skill, holidays excluded
+    required = required_skills(rules)
+    skill_grid = skill_counts.reshape(n_days, len(locations), len(shift_types), len(skills))
+    missing_skills = []
+    for (l, s), needs in slot_requirements(rules, locations, shift_types).items():
+        for k, count in needs:
+            have = skill_grid[:, l, s, skills.index(required[k])]
+            days = np.flatnonzero((have < count) & open_day)
+            missing_skills.append(pd.DataFrame({
+                'Date': horizon[days],
+                'Location': locations[l],
+                'Shift': shift_types[s],
+                'Skill': required[k],
+                'Required': count,
+                'Staffed': have[days],
+                'Missing': count - have[days]
+            }))
+    columns = ['Date', 'Location', 'Shift', 'Skill', 'Required', 'Staffed', 'Missing']
+    skill_short = pd.concat(missing_skills, ignore_index=True) if missing_skills else pd.DataFrame(columns=columns)
+
+    # Per-employee utilization and preference hits
+    n = len(roster)
+    loc_pref = roster.preference_matrix(locations, 'location')
+    shift_pref = roster.preference_matrix(shift_types, 'shift')
+    loc_hit = np.zeros(len(emp_code), dtype=bool)
+    shift_hit = np.zeros(len(emp_code), dtype=bool)
+    rows = known & (loc_code >= 0)
+    loc_hit[rows] = loc_pref[emp_code[rows], loc_code[rows]]
+    rows = known & (shift_code >= 0)
+    shift_hit[rows] = shift_pref[emp_code[rows], shift_code[rows]]
+
+    scheduled = np.bincount(emp_code[known], minlength=n)
+    # With the rolling horizon the cap applies to each ISO week
+    if rules['rolling_horizon']:
+        periods = len(horizon.isocalendar()[['year', 'week']].drop_duplicates())
+    else:
+        periods = 1
+    max_shifts = rules['max_shifts_per_employee'] * periods
+    utilization = pd.DataFrame({
+        'EmployeeID': roster.ids,
+        'Name': [e.name for e in roster],
+        'ScheduledShifts': scheduled,
+        'MaxShifts': max_shifts,
+        'Utilization': scheduled / max_shifts if max_shifts else 0.0,
+        'LocationHits': np.bincount(emp_code[known], weights=loc_hit[known], minlength=n).astype(np.int64),
+        'ShiftHits': np.bincount(emp_code[known], weights=shift_hit[known], minlength=n).astype(np.int64)
+    })
+
+    matched = int(known.sum())
+    slots = int(open_day.sum()) * len(locations) * len(shift_types)
+    summary = {
+        'assignments': len(schedule_df),
+        'slots': slots,
+        'understaffed_slots': len(understaffed),
+        'shortfall': int(understaffed['Missing'].sum()),
+        'skill_shortfall': int(skill_short['Missing'].sum()),
+        'coverage_rate': 1 - len(understaffed) / slots if slots else 1.0,
+        'location_hit_rate': float(loc_hit[known].mean()) if matched else 0.0,
+        'shift_hit_rate': float(shift_hit[known].mean()) if matched else 0.0,
+        'mean_utilization': float(utilization['Utilization'].mean()) if n else 0.0
+    }
+    return {
+        'coverage': coverage,
+        'understaffed': understaffed,
+        'skill_mix': skill_mix,
+        'skill_short': skill_short,
+        'utilization': utilization,
+        'summary': summary
+    }
+
+def coverage_styles(coverage, shift_types, min_staff, short='#99ccff', ok='#666699'):
+    # CSS for Styler.apply(axis=None): one vectorized comparison instead of
+    # a Python call per cell
+    styles = pd.DataFrame('', index=coverage.index, columns=coverage.columns)
+    values = coverage[shift_types].to_numpy()
+    styles[shift_types] = np.where(values < min_staff, f'background-color: {short}', f'background-color: {ok}')
+    return styles
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from concurrent.futures import as_completed
+import pandas as pd
+from modules import db_manager
+from modules.config import SchedulerConfig
+from modules.parallel import process_pool
+from modules.quality import evaluate_schedule
+from modules.roster import Roster
+from modules.scheduler_engine import start_of_day, schedule_horizon, solve_schedule, schedule_to_dataframe
+
+FORMATS = ('csv', 'parquet', 'sqlite')
+
+# ----------------------------
+# Batch Scheduling
+# ----------------------------
+# Library entry point for scheduling sites without the app: each site is a
+# roster file plus rules, solved with the same engine the Schedule page
+# uses, and written to an output directory. Nothing here imports
+# streamlit, so batch jobs start fast and run under cron or CI.
+#
+#   from modules.batch import load_rules, run_site
+#   result = run_site('north', 'north_employees.csv', load_rules('rules.json'), out='results')
+#
+# Rosters are CSV (the app's employee export), Parquet or JSON records.
+# Rules files are JSON objects of rule overrides; anything left out keeps
+# its default. Results are written as:
+#
+#   csv      <out>/<site>_schedule.csv, the same file the app imports
+#   parquet  <out>/<site>_schedule.parquet (needs pyarrow)
+#   sqlite   <out>/scheduleme.db, one session per site
+#
+# run_sites() runs many sites, in separate processes when workers > 1.
+
+def load_rules(path=None, **overrides):
+    rules = {}
+    if path is not None:
+        with open(path) as f:
+            rules = json.load(f)
+    return SchedulerConfig(**{**rules, **overrides})
+
+def read_roster(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        from modules import parquet_store
+        return parquet_store.read_employees(path, db_manager.EMPLOYEE_COLUMNS)
+    if ext == '.json':
+        return pd.read_json(path, orient='records', dtype=False)
+    return pd.read_csv(path)
+
+def load_sites(path):
+    # Manifest: [{"name": ..., "roster": ..., "rules": path or {overrides}}],
+    # relative paths taken from the manifest's directory
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        entries = json.load(f)
+    sites = []
+    for entry in entries:
+        roster = os.path.join(base, entry['roster'])
+        rules = entry.get('rules')
+        if isinstance(rules, str):
+            rules = load_rules(os.path.join(base, rules))
+        elif isinstance(rules, dict):
+            rules = SchedulerConfig(**rules)
+        sites.append((entry.get('name') or site_name(roster), roster, rules))
+    return sites
+
+def site_name(roster_path):
+    name = os.path.splitext(os.path.basename(roster_path))[0]
+    return name[:-len('_employees')] if name.endswith('_employees') else name
+
+def write_site(name, employees, schedule_df, out, fmt):
+    os.makedirs(out, exist_ok=True)
+    if fmt == 'csv':
+        path = os.path.join(out, f"{name}_schedule.csv")
+        schedule_df.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        from modules import parquet_store
+        path = os.path.join(out, f"{name}_schedule.parquet")
+        parquet_store.write_schedule(path, schedule_df)
+    elif fmt == 'sqlite':
+        # Written straight to <out>/scheduleme.db, one session per site, so
+        # concurrent sites never redirect the app's own database
+        path = os.path.join(out, db_manager.DB_FILE)
+        with db_manager.open_db(path) as conn:
+            db_manager.write_employees(conn, name, employees)
+            db_manager.write_schedule(conn, name, schedule_df)
+    else:
+        raise ValueError(f"Unknown output format '{fmt}', expected one of {FORMATS}")
+    return path
+
+def run_site(name, roster_path, config=None, out=None, fmt='csv', solver='greedy', time_limit=30,
+             start_date=None, workers=None):
+    # Returns the site's timings (seconds) and quality summary; with
+    # out=None the schedule is only scored, not written
+    config = SchedulerConfig() if config is None else config
+    workers = workers or config['parallel_workers']
+    timings = {}
+
+    start = time.perf_counter()
+    employees = read_roster(roster_path)
+    roster = Roster.from_dataframe(employees)
+    timings['load'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schedule_days = schedule_horizon(start_of_day(start_date), config)
+    schedule = solve_schedule(roster, schedule_days, config, solver, time_limit, workers)
+    timings['solve'] = time.perf_counter() - start
+
+    path = None
+    if out is not None:
+        start = time.perf_counter()
+        path = write_site(name, employees, schedule_to_dataframe(schedule, roster), out, fmt)
+        timings['write'] = time.perf_counter() - start
+    timings['total'] = sum(timings.values())
+
+    quality = evaluate_schedule(
+        schedule, roster, schedule_days, config['shift_types'], config['active_locations'], config
+    )
+    return {
+        'site': name,
+        'employees': len(roster),
+        'days': len(schedule_days),
+        'assignments': len(schedule),
+        'output': path,
+        'timings': timings,
+        'quality': quality
+    }
+
+def run_sites(sites, workers=1, callback=None, **options):
+    # sites: [(name, roster_path, config or None), ...]; results come back
+    # in input order, callback(result) fires as each site finishes
+    results = [None] * len(sites)
+    if workers > 1 and len(sites) > 1:
+        with process_pool(min(workers, len(sites))) as pool:
+            futures = {
+                pool.submit(run_site, name, path, config, **options): k
+                for k, (name, path, config) in enumerate(sites)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if callback is not None:
+                    callback(results[futures[future]])
+    else:
+        for k, (name, path, config) in enumerate(sites):
+            results[k] = run_site(name, path, config, **options)
+            if callback is not None:
+                callback(results[k])
+    return results
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import numbers
+from collections.abc import Mapping
+from modules.roster import to_ordinal
+
+# ----------------------------
+# Default Rules
+# ----------------------------
+
+DEFAULT_RULES = {
+    'enforce_work_pattern': True,
+    'enforce_max_one_shift_per_day': True,
+    'enforce_no_morning_after_night': True,
+    'shift_preference_mode': 'soft',
+    'location_preference_mode': 'soft',
+    'use_seniority_weighting': True,
+
+    'enforce_consecutive_day_limit': True,
+    'max_consecutive_days': 5,
+    'enforce_shift_cooldown': True,
+    'min_hours_between_shifts': 12,
+    'rest_from_shift_end': False,
+
+    'min_staff_threshold': 1,
+    'max_staff_per_shift': 3,
+    'max_shifts_per_employee': 5,
+    'shift_types': ['Morning', 'Afternoon', 'Night'],
+    'shift_definitions': [['Morning', 8, 8], ['Afternoon', 16, 8], ['Night', 22, 8]],
+    'schedule_days': 7,
+    'active_locations': ["ZoneA", "ZoneB", "ZoneC"],
+    'holiday_dates': [],
+    'skill_requirements': [],
+
+    'parallel_workers': 1,
+    'rebalance_seconds': 0,
+    'rolling_horizon': False
+}
+
+def check_rule(key, value):
+    # A rule value must have the type of its default (lists may be tuples),
+    # so a bad override fails here instead of deep inside the engine
+    if key not in DEFAULT_RULES:
+        raise ValueError(f"Unknown scheduler rule: {key}")
+    default = DEFAULT_RULES[key]
+    if isinstance(default, bool):
+        ok, kind = isinstance(value, bool), 'true or false'
+    elif isinstance(default, int):
+        ok, kind = isinstance(value, numbers.Integral) and not isinstance(value, bool), 'an integer'
+    elif isinstance(default, list):
+        ok, kind = isinstance(value, (list, tuple)), 'a list'
+    else:
+        ok, kind = isinstance(value, str), 'a string'
+    if not ok:
+        raise ValueError(f"Rule '{key}' expects {kind}, got {value!r}")
+    return value
+
+def parse_rule(text):
+    # KEY=VALUE from the command line, the value parsed as JSON when it can
+    # be (bare words stay strings) and checked against the rule's default
+    key, sep, value = text.partition('=')
+    if not sep:
+        raise ValueError(f"Expected KEY=VALUE, got '{text}'")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key, check_rule(key, value)
+
+# ----------------------------
+# Scheduler Config
+# ----------------------------
+# Immutable, hashable set of rules for one run. Reads like a plain rules
+# dict (config['min_staff_threshold'], .get, iteration) but cannot be
+# changed in place: replace() returns a new config. Lists are stored as
+# tuples so two configs with the same rules hash and compare equal, which
+# makes a config safe to share with worker processes and to use as a
+# cache key.
+
+def freeze(val):
+    return tuple(freeze(item) for item in val) if isinstance(val, (list, tuple, set, frozenset)) else val
+
+def thaw(val):
+    return [thaw(item) for item in val] if isinstance(val, tuple) else val
+
+class SchedulerConfig(Mapping):
+    __slots__ = ('_values', '_hash')
+
+    def __init__(self, **rules):
+        unknown = set(rules) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"Unknown scheduler rule(s): {', '.join(sorted(unknown))}")
+        for key, value in rules.items():
+            check_rule(key, value)
+        values = {key: freeze(rules.get(key, default)) for key, default in DEFAULT_RULES.items()}
+        object.__setattr__(self, '_values', values)
+        object.__setattr__(self, '_hash', hash(tuple(values.items())))
+
+    @classmethod
+    def from_dict(cls, rules):
+        return cls(**rules)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SchedulerConfig is immutable; use replace()")
+
+    def __reduce__(self):
+        return (self.__class__.from_dict, (self.to_dict(),))
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, SchedulerConfig):
+            return self._hash == other._hash and self._values == other._values
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SchedulerConfig({self._values!r})"
+
+    def replace(self, **changes):
+        return SchedulerConfig(**{**self._values, **changes})
+
+    def to_dict(self):
+        return {key: thaw(val) for key, val in self._values.items()}
+
+    def digest(self):
+        # hash() of strings changes between processes; this does not
+        text = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+def holiday_ordinals(rules):
+    # Holidays as day ordinals, so the engine can test date.toordinal() or a
+    # day index against a set of ints instead of formatting every date
+    ordinals = (to_ordinal(day) for day in rules['holiday_dates'])
+    return frozenset(o for o in ordinals if o is not None)
+
+# ----------------------------
+# Per-session Config
+# ----------------------------
+# Each Streamlit session keeps its own config, so users sharing a server
+# process never see each other's rules. Library callers pass a config
+# explicitly and never import streamlit.
+
+def get_session_config():
+    import streamlit as st
+    if 'scheduler_config' not in st.session_state:
+        st.session_state.scheduler_config = SchedulerConfig()
+    return st.session_state.scheduler_config
+
+def set_session_config(config):
+    import streamlit as st
+    st.session_state.scheduler_config = config
+    return config
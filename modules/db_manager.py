@@ -1,25 +1,140 @@
 import pandas as pd
 import os
 import json
-import streamlit as st
+import glob
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from modules.roster import Roster
 
 DB_DIR = "data"
+DB_FILE = "scheduleme.db"
+
+# "sqlite" (default) or "parquet", which keeps each session's roster and
+# schedule as Parquet files under data/parquet (needs pyarrow)
+STORAGE = "sqlite"
+PARQUET_DIR = "parquet"
+
+EMPLOYEE_COLUMNS = [
+    "EmployeeID", "Name", "PhoneNumber",
+    "DateHired", "WorkPattern",
+    "PreferredLocations", "PreferredShifts",
+    "SkillLevel", "UnavailableDates"
+]
+SCHEDULE_COLUMNS = ["EmployeeID", "Name", "Date", "Shift", "Location", "Locked"]
+
+# Preference lists are stored one row per value, tagged with their column
+PREFERENCE_KINDS = {
+    'WorkPattern': 'workday',
+    'PreferredLocations': 'location',
+    'PreferredShifts': 'shift'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    session_id  TEXT NOT NULL,
+    employee_id TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    name        TEXT,
+    phone       TEXT,
+    date_hired  TEXT,
+    skill_level TEXT,
+    PRIMARY KEY (session_id, employee_id)
+);
+CREATE TABLE IF NOT EXISTS preferences (
+    session_id  TEXT NOT NULL,
+    employee_id TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    value       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_preferences_employee ON preferences (session_id, employee_id);
+CREATE TABLE IF NOT EXISTS unavailability (
+    session_id  TEXT NOT NULL,
+    employee_id TEXT NOT NULL,
+    date        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_unavailability_employee ON unavailability (session_id, employee_id);
+CREATE TABLE IF NOT EXISTS assignments (
+    session_id  TEXT NOT NULL,
+    employee_id TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    shift       TEXT NOT NULL,
+    location    TEXT NOT NULL,
+    locked      INTEGER NOT NULL DEFAULT 0,
+    position    INTEGER NOT NULL,
+    PRIMARY KEY (session_id, employee_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_assignments_slot ON assignments (session_id, date, location, shift);
+CREATE INDEX IF NOT EXISTS idx_assignments_employee ON assignments (session_id, employee_id);
+CREATE TABLE IF NOT EXISTS csv_imports (
+    path TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS versions (
+    session_id  TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    PRIMARY KEY (session_id, kind)
+);
+"""
+
+# Loaded frames are kept per (database, session, kind) and reused while the
+# stored version token is unchanged. Every write replaces the token with a
+# random value, so writes from other processes invalidate the cache too.
+# With Parquet storage the token is the files' modification time and size.
+CACHE_SIZE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
 
 # ----------------------------
 # Utility
 # ----------------------------
 
+# Background jobs run outside the Streamlit script thread and have no
+# session_state, so they pin the session they were started from. Batch
+# runs pin one the same way; streamlit is only imported when no session
+# is pinned, so the engine can be used without it. A thread can pin its
+# data directory the same way (use_data_dir) without moving DB_DIR for
+# every other thread; one-off writes pass a database path to open_db().
+_local = threading.local()
+
+@contextmanager
+def use_session(session_id):
+    previous = getattr(_local, 'session_id', None)
+    _local.session_id = session_id
+    try:
+        yield
+    finally:
+        _local.session_id = previous
+
 def get_session_id():
+    session_id = getattr(_local, 'session_id', None)
+    if session_id is not None:
+        return session_id
+    import streamlit as st
     if 'session_id' not in st.session_state:
         import uuid
         st.session_state.session_id = str(uuid.uuid4())
     return st.session_state.session_id
 
-def get_employee_csv():
-    return os.path.join(DB_DIR, f"{get_session_id()}_employees.csv")
+@contextmanager
+def use_data_dir(path):
+    previous = getattr(_local, 'data_dir', None)
+    _local.data_dir = path
+    try:
+        yield
+    finally:
+        _local.data_dir = previous
+
+def get_data_dir():
+    return getattr(_local, 'data_dir', None) or DB_DIR
 
-def get_schedule_csv():
-    return os.path.join(DB_DIR, f"{get_session_id()}_schedule.csv")
+def get_db_path():
+    return os.path.join(get_data_dir(), DB_FILE)
+
+def get_parquet_path(session_id, kind):
+    return os.path.join(get_data_dir(), PARQUET_DIR, f"{session_id}_{kind}.parquet")
 
 def safe_json(val):
     try:
@@ -27,71 +142,358 @@ def safe_json(val):
     except Exception:
         return []
 
+def as_values(val):
+    val = safe_json(val)
+    return list(val) if isinstance(val, (list, tuple, set)) else []
+
+def as_text(val):
+    return None if pd.isna(val) else str(val)
+
+def date_text(val):
+    return str(pd.Timestamp(val))
+
+_initialized = set()
+
+def connect(path=None):
+    path = get_db_path() if path is None else path
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fresh = path not in _initialized or not os.path.exists(path)
+    conn = sqlite3.connect(path, timeout=30)
+    if fresh:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        import_csv_sessions(conn, os.path.dirname(path))
+        _initialized.add(path)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+@contextmanager
+def open_db(path=None):
+    conn = connect(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+# ----------------------------
+# Cache
+# ----------------------------
+
+def get_version(conn, session_id, kind):
+    row = conn.execute(
+        "SELECT version FROM versions WHERE session_id = ? AND kind = ?", (session_id, kind)
+    ).fetchone()
+    return row[0] if row else None
+
+def bump_version(conn, session_id, kind):
+    conn.execute(
+        "INSERT INTO versions VALUES (?, ?, random()) "
+        "ON CONFLICT (session_id, kind) DO UPDATE SET version = random()",
+        (session_id, kind)
+    )
+    drop_cached(session_id, kind)
+
+def drop_cached(session_id, kind):
+    with _cache_lock:
+        for key in [key for key in _cache if key[1] == session_id and key[3] == kind]:
+            del _cache[key]
+
+def cached_load(kind, reader, name=None):
+    session_id = get_session_id()
+    if STORAGE == 'parquet':
+        return cached_parquet_load(session_id, kind, reader, name)
+    with open_db() as conn:
+        version = get_version(conn, session_id, kind)
+        key = (get_db_path(), session_id, name or kind, kind)
+        with _cache_lock:
+            hit = _cache.get(key)
+            if hit is not None and hit[0] == version:
+                _cache.move_to_end(key)
+                return hit[1]
+        value = reader(conn, session_id)
+
+    with _cache_lock:
+        _cache[key] = (version, value)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+def cached_parquet_load(session_id, kind, reader, name=None):
+    # The schedule's names come from the roster file, so its version
+    # covers both files
+    from modules import parquet_store
+    if not os.path.exists(get_parquet_path(session_id, 'employees')):
+        import_sqlite_session(session_id)
+    paths = [get_parquet_path(session_id, kind)]
+    if kind == 'schedule':
+        paths.append(get_parquet_path(session_id, 'employees'))
+    version = parquet_store.version(*paths)
+    key = (paths[0], session_id, name or kind, kind)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] == version:
+            _cache.move_to_end(key)
+            return hit[1]
+    value = reader(None, session_id)
+
+    with _cache_lock:
+        _cache[key] = (version, value)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
 # ----------------------------
 # Employee I/O
 # ----------------------------
 
 def load_employees():
-    path = get_employee_csv()
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=[
-            "EmployeeID","Name", "PhoneNumber"
-            "DateHired","WorkPattern",
-            "PreferredLocations","PreferredShifts",
-            "SkillLevel", "UnavailableDates"
-        ])
-    
-    df = pd.read_csv(path)
+    # Callers add columns to the frame, so hand out copies of the cached one
+    return cached_load('employees', read_employees).copy()
+
+def read_employees(conn, session_id):
+    if STORAGE == 'parquet':
+        from modules import parquet_store
+        return parquet_store.read_employees(get_parquet_path(session_id, 'employees'), EMPLOYEE_COLUMNS)
+    return select_employees(conn, session_id)
+
+def select_employees(conn, session_id):
+    rows = conn.execute(
+        "SELECT employee_id, name, phone, date_hired, skill_level FROM employees "
+        "WHERE session_id = ? ORDER BY position", (session_id,)
+    ).fetchall()
+    prefs = conn.execute(
+        "SELECT employee_id, kind, value FROM preferences "
+        "WHERE session_id = ? ORDER BY employee_id, kind, position", (session_id,)
+    ).fetchall()
+    unavailable = conn.execute(
+        "SELECT employee_id, date FROM unavailability "
+        "WHERE session_id = ? ORDER BY employee_id, date", (session_id,)
+    ).fetchall()
+
+    if not rows:
+        return pd.DataFrame(columns=EMPLOYEE_COLUMNS)
+
+    lists = {}
+    for emp_id, kind, value in prefs:
+        lists.setdefault((emp_id, kind), []).append(value)
+    for emp_id, date in unavailable:
+        lists.setdefault((emp_id, 'unavailable'), []).append(date)
+
+    df = pd.DataFrame(rows, columns=["EmployeeID", "Name", "PhoneNumber", "DateHired", "SkillLevel"])
     df['DateHired'] = pd.to_datetime(df['DateHired'], errors='coerce')
-    df['WorkPattern'] = df['WorkPattern'].apply(safe_json)
-    df['PreferredLocations'] = df['PreferredLocations'].apply(safe_json)
-    df['PreferredShifts'] = df.get('PreferredShifts', pd.Series([[]]*len(df))).apply(safe_json)
-    df['UnavailableDates'] = df.get('UnavailableDates', pd.Series([[]]*len(df))).apply(safe_json)
-    return df
+    for col, kind in PREFERENCE_KINDS.items():
+        df[col] = [lists.get((emp_id, kind), []) for emp_id in df['EmployeeID']]
+    df['UnavailableDates'] = [lists.get((emp_id, 'unavailable'), []) for emp_id in df['EmployeeID']]
+    return df[EMPLOYEE_COLUMNS]
+
+def load_roster():
+    return cached_load('employees', read_roster, name='roster')
+
+def read_roster(conn, session_id):
+    if STORAGE == 'parquet':
+        from modules import parquet_store
+        return parquet_store.read_roster(get_parquet_path(session_id, 'employees'))
+    return Roster.from_dataframe(select_employees(conn, session_id))
 
 def save_employees(df):
-    os.makedirs(DB_DIR, exist_ok=True)
-    df.to_csv(get_employee_csv(), index=False)
+    if STORAGE == 'parquet':
+        from modules import parquet_store
+        session_id = get_session_id()
+        parquet_store.write_employees(get_parquet_path(session_id, 'employees'), df, as_values)
+        drop_cached(session_id, 'employees')
+        drop_cached(session_id, 'schedule')
+        return
+    with open_db() as conn:
+        write_employees(conn, get_session_id(), df)
+
+def save_employee_chunks(chunks):
+    # Replaces the session's roster with an iterable of employee frames,
+    # writing each as it arrives so only one chunk is held in memory
+    session_id = get_session_id()
+    if STORAGE == 'parquet':
+        from modules import parquet_store
+        parquet_store.write_employee_chunks(get_parquet_path(session_id, 'employees'), chunks, as_values)
+        drop_cached(session_id, 'employees')
+        drop_cached(session_id, 'schedule')
+        return
+    with open_db() as conn:
+        clear_employees(conn, session_id)
+        position = 0
+        for df in chunks:
+            insert_employees(conn, session_id, df, position)
+            position += len(df)
+        bump_version(conn, session_id, 'employees')
+        bump_version(conn, session_id, 'schedule')
+
+def write_employees(conn, session_id, df):
+    clear_employees(conn, session_id)
+    insert_employees(conn, session_id, df)
+    # Schedule rows carry employee names, so they go stale as well
+    bump_version(conn, session_id, 'employees')
+    bump_version(conn, session_id, 'schedule')
+
+def clear_employees(conn, session_id):
+    for table in ("employees", "preferences", "unavailability"):
+        conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+def insert_employees(conn, session_id, df, start=0):
+    def column(name):
+        return df[name] if name in df else [None] * len(df)
+
+    hired = pd.to_datetime(pd.Series(list(column('DateHired')), dtype=object), errors='coerce', format='mixed')
+    hired = hired.dt.strftime('%Y-%m-%d')
+    employees, prefs, unavailable = [], [], []
+    rows = zip(
+        column('EmployeeID'), column('Name'), column('PhoneNumber'), hired,
+        column('SkillLevel'), column('WorkPattern'), column('PreferredLocations'),
+        column('PreferredShifts'), column('UnavailableDates')
+    )
+    for position, (emp_id, name, phone, hired, skill, pattern, locs, shifts, days) in enumerate(rows, start):
+        employees.append((
+            session_id, str(emp_id), position, as_text(name), as_text(phone), as_text(hired), as_text(skill)
+        ))
+        for kind, values in (('workday', pattern), ('location', locs), ('shift', shifts)):
+            prefs.extend(
+                (session_id, str(emp_id), kind, i, str(value)) for i, value in enumerate(as_values(values))
+            )
+        unavailable.extend((session_id, str(emp_id), str(day)) for day in as_values(days))
+
+    conn.executemany("INSERT OR REPLACE INTO employees VALUES (?, ?, ?, ?, ?, ?, ?)", employees)
+    conn.executemany("INSERT INTO preferences VALUES (?, ?, ?, ?, ?)", prefs)
+    conn.executemany("INSERT INTO unavailability VALUES (?, ?, ?)", unavailable)
 
 # ----------------------------
 # Schedule I/O
 # ----------------------------
 
 def load_schedule():
-    path = get_schedule_csv()
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=[
-            "EmployeeID", "Name", "Date", "Shift", "Location", "Locked"
-        ])
-    
-    df = pd.read_csv(path)
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    if 'Locked' not in df.columns:
-        df['Locked'] = False
+    return cached_load('schedule', read_schedule).copy()
+
+def read_schedule(conn, session_id):
+    if STORAGE == 'parquet':
+        from modules import parquet_store
+        return parquet_store.read_schedule(
+            get_parquet_path(session_id, 'schedule'), get_parquet_path(session_id, 'employees'), SCHEDULE_COLUMNS
+        )
+    return select_schedule(conn, session_id)
+
+def select_schedule(conn, session_id):
+    rows = conn.execute(
+        "SELECT a.employee_id, COALESCE(e.name, 'Unknown'), a.date, a.shift, a.location, a.locked "
+        "FROM assignments a LEFT JOIN employees e "
+        "ON e.session_id = a.session_id AND e.employee_id = a.employee_id "
+        "WHERE a.session_id = ? ORDER BY a.position", (session_id,)
+    ).fetchall()
+
+    df = pd.DataFrame(rows, columns=SCHEDULE_COLUMNS)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce', format='ISO8601')
+    df['Locked'] = df['Locked'].astype(bool)
     return df
 
 def save_schedule(df):
-    os.makedirs(DB_DIR, exist_ok=True)
-    df.to_csv(get_schedule_csv(), index=False)
+    if STORAGE == 'parquet':
+        from modules import parquet_store
+        session_id = get_session_id()
+        parquet_store.write_schedule(get_parquet_path(session_id, 'schedule'), df)
+        drop_cached(session_id, 'schedule')
+        return
+    # Upsert only the rows that changed; rows missing from df are deleted
+    with open_db() as conn:
+        write_schedule(conn, get_session_id(), df)
+
+def write_schedule(conn, session_id, df):
+    stored = {
+        (emp_id, date): (shift, location, locked)
+        for emp_id, date, shift, location, locked in conn.execute(
+            "SELECT employee_id, date, shift, location, locked FROM assignments WHERE session_id = ?",
+            (session_id,)
+        )
+    }
+    next_position = conn.execute(
+        "SELECT COALESCE(MAX(position) + 1, 0) FROM assignments WHERE session_id = ?", (session_id,)
+    ).fetchone()[0]
+
+    locked_col = df['Locked'] if 'Locked' in df else [False] * len(df)
+    keep = set()
+    upserts = []
+    for emp_id, date, shift, location, locked in zip(
+        df['EmployeeID'], df['Date'], df['Shift'], df['Location'], locked_col
+    ):
+        key = (str(emp_id), date_text(date))
+        values = (shift, location, int(bool(locked)))
+        keep.add(key)
+        if stored.get(key) != values:
+            upserts.append((session_id, *key, *values, next_position))
+            next_position += 1
+
+    deletes = [(session_id, *key) for key in stored.keys() - keep]
+    conn.executemany(
+        "DELETE FROM assignments WHERE session_id = ? AND employee_id = ? AND date = ?", deletes
+    )
+    conn.executemany(
+        "INSERT INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (session_id, employee_id, date) DO UPDATE SET "
+        "shift = excluded.shift, location = excluded.location, locked = excluded.locked",
+        upserts
+    )
+    if upserts or deletes:
+        bump_version(conn, session_id, 'schedule')
+
+# ----------------------------
+# CSV Import
+# ----------------------------
+# Sessions used to live in data/{session_id}_employees.csv and
+# data/{session_id}_schedule.csv. Each file is imported into the database
+# once, the first time the database is opened, and then left in place.
+
+def import_csv_sessions(conn, data_dir):
+    done = {row[0] for row in conn.execute("SELECT path FROM csv_imports")}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*_employees.csv"))):
+        if path in done:
+            continue
+        session_id = os.path.basename(path)[:-len("_employees.csv")]
+        df = pd.read_csv(path)
+        if len(df):
+            write_employees(conn, session_id, df)
+        conn.execute("INSERT OR IGNORE INTO csv_imports VALUES (?)", (path,))
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "*_schedule.csv"))):
+        if path in done:
+            continue
+        session_id = os.path.basename(path)[:-len("_schedule.csv")]
+        df = pd.read_csv(path)
+        if len(df):
+            df['Date'] = pd.to_datetime(df['Date'], errors='coerce', format='ISO8601')
+            write_schedule(conn, session_id, df.dropna(subset=['Date']))
+        conn.execute("INSERT OR IGNORE INTO csv_imports VALUES (?)", (path,))
+    conn.commit()
+
+# ----------------------------
+# SQLite -> Parquet
+# ----------------------------
+# With STORAGE = "parquet", a session that has no Parquet roster yet is
+# copied over from the database (including any CSVs imported into it) the
+# first time it is read.
+
+def import_sqlite_session(session_id):
+    from modules import parquet_store
+    with open_db() as conn:
+        employees = select_employees(conn, session_id)
+        schedule = select_schedule(conn, session_id)
+    if employees.empty:
+        return
+    parquet_store.write_employees(get_parquet_path(session_id, 'employees'), employees, as_values)
+    if not schedule.empty:
+        parquet_store.write_schedule(get_parquet_path(session_id, 'schedule'), schedule)
 
 # ----------------------------
 # Initialization
 # ----------------------------
 
 def init_db():
-    os.makedirs(DB_DIR, exist_ok=True)
-
-    emp_path = get_employee_csv()
-    sched_path = get_schedule_csv()
-
-    if not os.path.exists(emp_path):
-        pd.DataFrame(columns=[
-            "EmployeeID", "DateHired", "WorkPattern",
-            "PreferredLocations", "PreferredShifts",
-            "UnavailableDates", "PhoneNumber", "SkillLevel"
-        ]).to_csv(emp_path, index=False)
-
-    if not os.path.exists(sched_path):
-        pd.DataFrame(columns=[
-            "EmployeeID", "Name", "Date", "Shift", "Location", "Locked"
-        ]).to_csv(sched_path, index=False)
+    connect().close()
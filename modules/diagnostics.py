@@ -0,0 +1,90 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+# ----------------------------
+# Run Profile
+# ----------------------------
+# Opt-in instrumentation for a scheduler run. Pass a RunProfile to
+# run_scheduler (or generate_schedule / fill_schedule_gaps) and it collects,
+# per phase, wall time, how many candidate evaluations were made and how
+# many employees each rule rejected, overall and per slot. Every hook in the
+# engine is behind an `if profile is not None` check, so runs without a
+# profile do no extra work.
+#
+# A rejected employee is charged to the first rule they fail, in the order
+# EligibilityIndex.rule_masks() applies them.
+
+def new_phase():
+    return {'wall_time': 0.0, 'calls': 0, 'candidates_evaluated': 0, 'assigned': 0, 'rejections': {}}
+
+class RunProfile:
+    def __init__(self):
+        self.phases = {}
+        self.slots = {}
+
+    @contextmanager
+    def phase(self, name):
+        stats = self.phases.setdefault(name, new_phase())
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats['wall_time'] += time.perf_counter() - start
+
+    def record(self, phase, date, location, shift, evaluated, rejections):
+        stats = self.phases.setdefault(phase, new_phase())
+        stats['calls'] += 1
+        stats['candidates_evaluated'] += evaluated
+        slot = self._slot(phase, date, location, shift)
+        slot['calls'] += 1
+        slot['candidates_evaluated'] += evaluated
+        for rule, count in rejections.items():
+            stats['rejections'][rule] = stats['rejections'].get(rule, 0) + count
+            slot['rejections'][rule] = slot['rejections'].get(rule, 0) + count
+
+    def record_assigned(self, phase, date, location, shift, count, staffed):
+        self.phases.setdefault(phase, new_phase())['assigned'] += count
+        slot = self._slot(phase, date, location, shift)
+        slot['assigned'] += count
+        slot['staffed'] = staffed
+
+    def _slot(self, phase, date, location, shift):
+        key = (phase, date.strftime('%Y-%m-%d'), location, shift)
+        if key not in self.slots:
+            self.slots[key] = {
+                'calls': 0, 'candidates_evaluated': 0, 'assigned': 0, 'staffed': 0, 'rejections': {}
+            }
+        return self.slots[key]
+
+    def merge(self, other):
+        # Folds in a profile collected elsewhere, e.g. in a worker process
+        for name, theirs in other['phases'].items():
+            stats = self.phases.setdefault(name, new_phase())
+            for field in ('wall_time', 'calls', 'candidates_evaluated', 'assigned'):
+                stats[field] += theirs[field]
+            for rule, count in theirs['rejections'].items():
+                stats['rejections'][rule] = stats['rejections'].get(rule, 0) + count
+        for row in other['slots']:
+            key = (row['phase'], row['date'], row['location'], row['shift'])
+            self.slots[key] = {field: val for field, val in row.items()
+                               if field not in ('phase', 'date', 'location', 'shift')}
+
+    def to_dict(self):
+        return {
+            'phases': self.phases,
+            'slots': [
+                {'phase': phase, 'date': date, 'location': location, 'shift': shift, **slot}
+                for (phase, date, location, shift), slot in self.slots.items()
+            ]
+        }
+
+    def to_json(self, path=None):
+        text = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+def timed(profile, name):
+    return nullcontext() if profile is None else profile.phase(name)
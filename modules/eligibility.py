@@ -0,0 +1,341 @@
+import numpy as np
+from datetime import date
+from modules.config import holiday_ordinals
+from modules.roster import as_roster
+from modules.shifts import shift_codes, conflict_matrices
+from modules.skills import required_skills, slot_requirements
+
+# ----------------------------
+# Eligibility Index
+# ----------------------------
+# Builds the employee x weekday / date / location / shift tensors once per
+# run so each (date, location, shift) slot is filtered and ranked with a
+# handful of array operations instead of a per-employee Python pass.
+#
+# Static rules (work pattern, unavailability, strict preferences) are baked
+# into the tensors. Rules that depend on what has already been assigned
+# (one shift per day, weekly cap, consecutive days, cooldown) are read from
+# per-employee day arrays that mirror the ScheduleState; call sync() after
+# the schedule was changed outside of assign(). With lookahead=False only
+# the days before a slot are checked, which is enough for a single pass in
+# day order; lookahead=True also checks the days after it, for edits inside
+# an already filled schedule. The engine needs lookahead: its fill pass
+# revisits days whose next day the first pass has already staffed.
+#
+# Days are handled as ordinals (date.toordinal()) throughout: schedule dates
+# are converted once here, and weekdays, ISO weeks, holidays and neighbouring
+# days are all derived from the integer.
+#
+# Skill requirements keep one boolean pool per required skill (emp_skill)
+# and a running count of each skill per slot (skill_count). fill_slot()
+# intersects the eligible mask with a skill pool to place missing skilled
+# staff first, then fills the rest of the slot as usual.
+#
+# max_shifts_per_employee applies per cap period: the whole horizon by
+# default, or each ISO week with rules['rolling_horizon']. assigned holds
+# one column per period.
+
+class EligibilityIndex:
+    def __init__(self, roster, schedule_days, shift_types, locations, rules, lookahead=False):
+        roster = as_roster(roster)
+        self.rules = rules
+        self.shift_types = list(shift_types)
+        self.locations = list(locations)
+        self.schedule_days = list(schedule_days)
+        self.emp_ids = np.array(roster.ids, dtype=object)
+        n = len(self.emp_ids)
+
+        # Day axis: every schedule day plus the neighbouring days its rules can
+        # reach, keyed by day ordinal so neighbours are plain integer offsets
+        self.lookback = max(rules['max_consecutive_days'], 1)
+        self.lookahead = lookahead
+        reach = self.lookback if lookahead else 0
+        self.ordinals = [day.toordinal() for day in self.schedule_days]
+        self.day_keys = []
+        self.day_index = {}
+        for o in self.ordinals:
+            for k in range(self.lookback, -reach - 1, -1):
+                if o - k not in self.day_index:
+                    self.day_index[o - k] = len(self.day_keys)
+                    self.day_keys.append(o - k)
+        self.slot_day = [self.day_index[o] for o in self.ordinals]
+        self.slot_pos = {o: day for day, o in enumerate(self.ordinals)}
+        holidays = holiday_ordinals(rules)
+        self.holiday = np.array([o in holidays for o in self.ordinals], dtype=bool)
+        self.rolling = rules['rolling_horizon']
+        slot_keys = [self.period_key(o) for o in self.ordinals]
+        self.period_keys = sorted(set(slot_keys), key=lambda key: key or ())
+        self.period_pos = {key: p for p, key in enumerate(self.period_keys)}
+        self.slot_period = [self.period_pos[key] for key in slot_keys]
+        self.prev_days = [
+            np.array([self.day_index[o - k] for k in range(1, self.lookback + 1)])
+            for o in self.ordinals
+        ]
+        self.next_days = [
+            np.array([self.day_index[o + k] for k in range(1, reach + 1)], dtype=np.int64)
+            for o in self.ordinals
+        ]
+
+        # Static employee tensors, read straight off the parsed roster
+        weekday_matrix = roster.weekday_matrix()
+        self.weekdays = [(o - 1) % 7 for o in self.ordinals]
+        self.work_mask = weekday_matrix if rules['enforce_work_pattern'] else np.ones_like(weekday_matrix)
+        self.unavailable = roster.unavailability_matrix(self.ordinals)
+        self.loc_pref = roster.preference_matrix(self.locations, 'location')
+        self.shift_pref = roster.preference_matrix(self.shift_types, 'shift')
+
+        # Candidate order per (location, shift): score desc, then DateHired asc
+        self.hire_rank = hire_rank = roster.hire_rank()
+        self.scores = {}
+        self.order = {}
+        for l, loc in enumerate(self.locations):
+            for s, shift in enumerate(self.shift_types):
+                score = self._preference_score(self.loc_pref[:, l], rules['location_preference_mode'])
+                score = score + self._preference_score(self.shift_pref[:, s], rules['shift_preference_mode'])
+                self.scores[(l, s)] = score
+                if rules['use_seniority_weighting']:
+                    self.order[(l, s)] = np.lexsort((hire_rank, -score))
+                else:
+                    self.order[(l, s)] = np.argsort(hire_rank, kind='stable')
+
+        # Shift codes: shift_types first, then any other defined or unknown
+        # shift an existing assignment may carry
+        code_names = shift_codes(self.shift_types, rules)
+        self.code_pos = {name: i for i, name in enumerate(code_names)}
+        self.other_code = len(code_names) - 1
+
+        # conflict[prev, next]: shift code `next` may not follow `prev` on the next day.
+        # Kept per rule as well so rejections can be attributed to either one
+        self.conflicts = conflict_matrices(code_names, rules)
+        self.conflict = np.zeros((len(code_names), len(code_names)), dtype=bool)
+        for matrix in self.conflicts.values():
+            self.conflict |= matrix
+
+        # Skill pools: emp_skill[i, k] is True when employee i has required skill k
+        self.skills = required_skills(rules)
+        self.skill_needs = slot_requirements(rules, self.locations, self.shift_types)
+        self.emp_skill = roster.skill_matrix(self.skills)
+        self.loc_pos = {loc: l for l, loc in enumerate(self.locations)}
+        self.shift_pos = {shift: s for s, shift in enumerate(self.shift_types)}
+
+        self.emp_pos = {emp_id: i for i, emp_id in enumerate(self.emp_ids)}
+        self.scheduled = np.zeros((n, len(self.day_keys)), dtype=bool)
+        self.shift_code = np.full((n, len(self.day_keys)), -1, dtype=np.int16)
+        self.assigned = np.zeros((n, max(len(self.period_keys), 1)), dtype=np.int64)
+        self.skill_count = np.zeros(
+            (len(self.schedule_days), len(self.locations), len(self.shift_types), len(self.skills)), dtype=np.int64
+        )
+
+    def period_key(self, ordinal):
+        return tuple(date.fromordinal(ordinal).isocalendar()[:2]) if self.rolling else None
+
+    @staticmethod
+    def _preference_score(preferred, mode):
+        if mode == 'soft':
+            return np.where(preferred, 1, -1)
+        return preferred.astype(np.int64)
+
+    # ----------------------------
+    # Dynamic state
+    # ----------------------------
+
+    def sync(self, schedule):
+        self.scheduled[:] = False
+        self.shift_code[:] = -1
+        self.assigned[:] = 0
+        self.skill_count[:] = 0
+        periods = {}
+        for (emp_id, day), info in schedule.items():
+            i = self.emp_pos.get(emp_id)
+            if i is None:
+                continue
+            o = day.toordinal()
+            if o not in periods:
+                periods[o] = self.period_pos.get(self.period_key(o))
+            p = periods[o]
+            if p is not None and not info.get('Locked', False):
+                self.assigned[i, p] += 1
+            d = self.day_index.get(o)
+            if d is not None:
+                self.scheduled[i, d] = True
+                self.shift_code[i, d] = self.code_pos.get(info['Shift'], self.other_code)
+            if self.skills:
+                self._count_skill(i, self.slot_pos.get(o), info['Location'], info['Shift'], 1)
+
+    def _count_skill(self, i, day, location, shift, change):
+        l = self.loc_pos.get(location)
+        s = self.shift_pos.get(shift)
+        if day is not None and l is not None and s is not None:
+            self.skill_count[day, l, s] += change * self.emp_skill[i]
+
+    def assign(self, schedule, i, day, location, shift):
+        d = self.slot_day[day]
+        schedule[(self.emp_ids[i], self.schedule_days[day])] = {
+            'Shift': shift,
+            'Location': location,
+            'Locked': False
+        }
+        self.scheduled[i, d] = True
+        self.shift_code[i, d] = self.code_pos[shift]
+        self.assigned[i, self.slot_period[day]] += 1
+        if self.skills:
+            self._count_skill(i, day, location, shift, 1)
+
+    def unassign(self, schedule, i, day):
+        d = self.slot_day[day]
+        info = schedule.pop((self.emp_ids[i], self.schedule_days[day]))
+        self.scheduled[i, d] = False
+        self.shift_code[i, d] = -1
+        self.assigned[i, self.slot_period[day]] -= 1
+        if self.skills:
+            self._count_skill(i, day, info['Location'], info['Shift'], -1)
+
+    # ----------------------------
+    # Slot queries
+    # ----------------------------
+
+    def static_mask(self, day, l, s):
+        rules = self.rules
+        mask = self.work_mask[:, self.weekdays[day]] & ~self.unavailable[:, day]
+        if rules['location_preference_mode'] == 'strict':
+            mask &= self.loc_pref[:, l]
+        if rules['shift_preference_mode'] == 'strict':
+            mask &= self.shift_pref[:, s]
+        return mask
+
+    def blocked_by_previous(self, day, s, conflict=None):
+        conflict = self.conflict if conflict is None else conflict
+        prev_code = self.shift_code[:, self.prev_days[day][0]]
+        worked_prev = prev_code >= 0
+        return worked_prev & conflict[np.where(worked_prev, prev_code, 0), s]
+
+    def blocked_by_next(self, day, s, conflict=None):
+        conflict = self.conflict if conflict is None else conflict
+        next_code = self.shift_code[:, self.next_days[day][0]]
+        worked_next = next_code >= 0
+        return worked_next & conflict[s, np.where(worked_next, next_code, 0)]
+
+    def eligible(self, day, l, s):
+        rules = self.rules
+        d = self.slot_day[day]
+        mask = self.static_mask(day, l, s)
+        mask &= ~self.scheduled[:, d]
+        mask &= self.assigned[:, self.slot_period[day]] < rules['max_shifts_per_employee']
+        mask &= ~self.blocked_by_previous(day, s)
+        if self.lookahead:
+            mask &= ~self.blocked_by_next(day, s)
+
+        if rules['enforce_consecutive_day_limit']:
+            mask &= self.consecutive_streak(day) < rules['max_consecutive_days']
+        return mask
+
+    def consecutive_streak(self, day):
+        limit = self.rules['max_consecutive_days']
+        prev = self.prev_days[day][:limit]
+        streak = np.logical_and.accumulate(self.scheduled[:, prev], axis=1).sum(axis=1)
+        if self.lookahead:
+            after = self.next_days[day][:limit]
+            streak += np.logical_and.accumulate(self.scheduled[:, after], axis=1).sum(axis=1)
+        return streak
+
+    def candidates(self, day, l, s):
+        order = self.order[(l, s)]
+        return order[self.eligible(day, l, s)[order]]
+
+    def skill_short(self, day, l, s):
+        # [(k, missing), ...] for the required skills the slot still lacks
+        counts = self.skill_count[day, l, s]
+        return [(k, count - counts[k]) for k, count in self.skill_needs.get((l, s), ()) if counts[k] < count]
+
+    def fill_slot(self, schedule, day, l, s, needed):
+        # Eligibility of one employee never depends on another's row, so the
+        # ranked candidates of a slot stay valid while it is being filled
+        needed = max(needed, 0)
+        skilled = []
+        if (l, s) in self.skill_needs:
+            # Missing skills first, each from the eligible pool ANDed with
+            # that skill's pool
+            order = self.order[(l, s)]
+            for k, missing in self.skill_short(day, l, s):
+                pool = self.eligible(day, l, s) & self.emp_skill[:, k]
+                for i in order[pool[order]][:min(missing, needed - len(skilled))]:
+                    self.assign(schedule, i, day, self.locations[l], self.shift_types[s])
+                    skilled.append(i)
+        picked = self.candidates(day, l, s)[:needed - len(skilled)]
+        for i in picked:
+            self.assign(schedule, i, day, self.locations[l], self.shift_types[s])
+        return np.concatenate([np.array(skilled, dtype=picked.dtype), picked]) if skilled else picked
+
+    def can_take(self, i, day, l, s):
+        # Single-employee form of eligible(), for local moves that only touch
+        # a couple of rows
+        rules = self.rules
+        d = self.slot_day[day]
+        if not self.work_mask[i, self.weekdays[day]] or self.unavailable[i, day]:
+            return False
+        if rules['location_preference_mode'] == 'strict' and not self.loc_pref[i, l]:
+            return False
+        if rules['shift_preference_mode'] == 'strict' and not self.shift_pref[i, s]:
+            return False
+        if self.scheduled[i, d] or self.assigned[i, self.slot_period[day]] >= rules['max_shifts_per_employee']:
+            return False
+
+        prev_code = self.shift_code[i, self.prev_days[day][0]]
+        if prev_code >= 0 and self.conflict[prev_code, s]:
+            return False
+        if self.lookahead:
+            next_code = self.shift_code[i, self.next_days[day][0]]
+            if next_code >= 0 and self.conflict[s, next_code]:
+                return False
+
+        if rules['enforce_consecutive_day_limit']:
+            limit = rules['max_consecutive_days']
+            streak = 0
+            for days in (self.prev_days[day][:limit], self.next_days[day][:limit]):
+                for k in days:
+                    if not self.scheduled[i, k]:
+                        break
+                    streak += 1
+            if streak >= limit:
+                return False
+        return True
+
+    # ----------------------------
+    # Diagnostics
+    # ----------------------------
+    # Same checks as eligible(), one mask per rule in the order the original
+    # per-employee loop applied them. Only used when a run is profiled, so
+    # the hot path above stays a single fused mask.
+
+    def rule_masks(self, day, l, s):
+        rules = self.rules
+        d = self.slot_day[day]
+        masks = []
+        if rules['enforce_work_pattern']:
+            masks.append(('work_pattern', self.work_mask[:, self.weekdays[day]]))
+        masks.append(('unavailable', ~self.unavailable[:, day]))
+        if rules['location_preference_mode'] == 'strict':
+            masks.append(('location_preference', self.loc_pref[:, l]))
+        if rules['shift_preference_mode'] == 'strict':
+            masks.append(('shift_preference', self.shift_pref[:, s]))
+        masks.append(('already_scheduled', ~self.scheduled[:, d]))
+        masks.append(('max_shifts', self.assigned[:, self.slot_period[day]] < rules['max_shifts_per_employee']))
+        if rules['enforce_consecutive_day_limit']:
+            masks.append(('consecutive_days', self.consecutive_streak(day) < rules['max_consecutive_days']))
+        for rule, conflict in self.conflicts.items():
+            blocked = self.blocked_by_previous(day, s, conflict)
+            if self.lookahead:
+                blocked |= self.blocked_by_next(day, s, conflict)
+            masks.append((rule, ~blocked))
+        return masks
+
+    def rejections(self, day, l, s):
+        # Each rejected employee is charged to the first rule they fail
+        remaining = np.ones(len(self.emp_ids), dtype=bool)
+        counts = {}
+        for rule, passed in self.rule_masks(day, l, s):
+            rejected = int(np.count_nonzero(remaining & ~passed))
+            if rejected:
+                counts[rule] = rejected
+            remaining &= passed
+        return counts
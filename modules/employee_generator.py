@@ -1,14 +1,12 @@
+import numpy as np
 import pandas as pd
 import random
 import json
 import string
 from datetime import datetime, timedelta
-from modules.db_manager import save_employees
-from modules.scheduler_engine import RULES
-from faker import Faker
+from modules.db_manager import save_employees, save_employee_chunks
+from modules.config import SchedulerConfig
 
-LOCATIONS = RULES['active_locations']
-SHIFT_TYPES = RULES['shift_types']
 WORK_PATTERNS = [
     ["Friday", "Saturday", "Sunday", "Monday", "Tuesday"],
     ["Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
@@ -17,10 +15,26 @@ WORK_PATTERNS = [
 ]
 SKILL_LEVELS = ["Tech1", "Tech2", "Tech3"]
 
-def generate_employees(n=30, seed=42):
-    random.seed(seed)
-    fake = Faker()
+# Faker takes longer to import than the rest of this module and builds its
+# provider tables on construction, so it is imported on first use and one
+# instance is kept per process. Faker.seed() reseeds the generator that
+# instance shares, so every call still gets reproducible names.
+_faker = None
+
+def get_faker(seed):
+    global _faker
+    from faker import Faker
+    if _faker is None:
+        _faker = Faker()
     Faker.seed(seed)
+    return _faker
+
+def generate_employees(n=30, seed=42, config=None):
+    config = SchedulerConfig() if config is None else config
+    locations = list(config['active_locations'])
+    shift_types = list(config['shift_types'])
+    random.seed(seed)
+    fake = get_faker(seed)
 
     def generate_id():
         return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
@@ -37,8 +51,8 @@ def generate_employees(n=30, seed=42):
 
         hire_date = today - timedelta(days=random.randint(30, 1000))
         work_pattern = random.choice(WORK_PATTERNS)
-        preferred_locations = random.sample(LOCATIONS, k=random.choice([1, 2]))
-        preferred_shifts = random.sample(SHIFT_TYPES, k=random.choice([1, len(SHIFT_TYPES)]))
+        preferred_locations = random.sample(locations, k=min(random.choice([1, 2]), len(locations)))
+        preferred_shifts = random.sample(shift_types, k=random.choice([1, len(shift_types)]))
         skill_level = random.choice(SKILL_LEVELS)
         full_name = fake.name()
         phone_number= fake.phone_number()
@@ -62,3 +76,103 @@ def generate_employees(n=30, seed=42):
     df = pd.DataFrame(employees)
     save_employees(df)
     return df
+
+# ----------------------------
+# Bulk Generator
+# ----------------------------
+# Same kind of roster as generate_employees, for load tests with tens or
+# hundreds of thousands of employees. Every field is drawn with NumPy from
+# one seeded Generator, a chunk at a time, and each chunk is written to the
+# storage backend as soon as it is built, so memory stays flat in n.
+#
+# IDs keep the 6-character [A-Z0-9] format but come from an affine
+# permutation of the ID space, k -> (a * k + b) mod 36^6 with a coprime to
+# 36, so they never collide and need no lookup set. Names come from small
+# built-in pools unless names='faker' is passed.
+
+ID_ALPHABET = np.array(list(string.ascii_uppercase + string.digits))
+ID_SPACE = len(ID_ALPHABET) ** 6
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Karen",
+    "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Sandra", "Mark", "Ashley", "Luis", "Emily"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson"
+]
+
+def encode_ids(codes):
+    digits = (codes[:, None] // len(ID_ALPHABET) ** np.arange(5, -1, -1)) % len(ID_ALPHABET)
+    return ID_ALPHABET[digits].view('<U6').ravel()
+
+def iter_employee_chunks(n, seed=42, config=None, chunk_size=10000, names='pool'):
+    config = SchedulerConfig() if config is None else config
+    locations = np.array(config['active_locations'], dtype=object)
+    shift_types = np.array(config['shift_types'], dtype=object)
+    rng = np.random.default_rng(seed)
+    fake = None
+    if names == 'faker':
+        fake = get_faker(seed)
+
+    # Multiplier coprime to 36 (odd, not a multiple of 3)
+    a = int(rng.integers(ID_SPACE // 7, ID_SPACE)) | 1
+    while a % 3 == 0:
+        a += 2
+    b = int(rng.integers(ID_SPACE))
+    today = np.datetime64(datetime.today().date(), 'D')
+
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        k = np.arange(start, start + size, dtype=np.int64)
+        emp_ids = encode_ids((a * k + b) % ID_SPACE)
+
+        hired = np.datetime_as_string(today - rng.integers(30, 1001, size=size), unit='D')
+        patterns = rng.integers(0, len(WORK_PATTERNS), size=size)
+        skills = rng.integers(0, len(SKILL_LEVELS), size=size)
+
+        # One or two distinct locations, one or all shift types
+        first_loc = rng.integers(0, len(locations), size=size)
+        two_locs = (rng.random(size) < 0.5) & (len(locations) > 1)
+        second_loc = (first_loc + 1 + rng.integers(0, max(len(locations) - 1, 1), size=size)) % len(locations)
+        one_shift = rng.random(size) < 0.5
+        shift_pick = rng.integers(0, len(shift_types), size=size)
+
+        off_days = today + rng.integers(8, 25, size=(size, 3))
+        off_count = rng.integers(1, 4, size=size)
+        off_text = np.datetime_as_string(off_days, unit='D')
+
+        if fake is not None:
+            full_names = [fake.name() for _ in range(size)]
+            phones = [fake.phone_number() for _ in range(size)]
+        else:
+            full_names = np.char.add(
+                np.char.add(np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), size=size)], " "),
+                np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), size=size)]
+            )
+            area, line = rng.integers(200, 1000, size=size), rng.integers(0, 10000, size=size)
+            phones = [f"555-{x:03d}-{y:04d}" for x, y in zip(area, line)]
+
+        yield pd.DataFrame({
+            "EmployeeID": emp_ids,
+            "Name": full_names,
+            "PhoneNumber": phones,
+            "DateHired": hired,
+            "WorkPattern": [WORK_PATTERNS[p] for p in patterns],
+            "PreferredLocations": [
+                [locations[x], locations[y]] if two else [locations[x]]
+                for x, y, two in zip(first_loc, second_loc, two_locs)
+            ],
+            "PreferredShifts": [
+                [shift_types[x]] if one else list(shift_types) for x, one in zip(shift_pick, one_shift)
+            ],
+            "SkillLevel": np.array(SKILL_LEVELS)[skills],
+            "UnavailableDates": [sorted(set(row[:c])) for row, c in zip(off_text.tolist(), off_count)]
+        })
+
+def generate_employees_bulk(n, seed=42, config=None, chunk_size=10000, names='pool'):
+    # Returns the number of employees written; load_employees() reads them back
+    save_employee_chunks(iter_employee_chunks(n, seed, config, chunk_size, names))
+    return n
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from modules.config import holiday_ordinals
+from modules.eligibility import EligibilityIndex
+from modules.roster import to_ordinal
+
+# ----------------------------
+# Incremental Re-scheduling
+# ----------------------------
+# Applies a change set to an existing schedule and re-solves only the slots
+# it can reach instead of regenerating every day. A change set is a dict
+# with any of:
+#
+#   'holidays':    ['YYYY-MM-DD', ...]                 newly blocked dates
+#   'unavailable': {emp_id: ['YYYY-MM-DD', ...], ...}  new call-outs
+#   'locks':       [{'EmployeeID', 'Date', 'Shift', 'Location'}, ...]
+#
+# Assignments that break because of the change are dropped. Consecutive-day
+# and cooldown rules reach max_consecutive_days either side of a change, so
+# every under-staffed slot in that window is refilled, with candidates
+# checked against the days before *and* after the slot. Locked and
+# unaffected assignments are never touched.
+
+def affected_window(dates, rules):
+    reach = max(rules['max_consecutive_days'], 1)
+    return {date + timedelta(days=k) for date in dates for k in range(-reach, reach + 1)}
+
+def horizon_days(schedule):
+    dates = sorted({date for (_, date) in schedule.keys()})
+    if not dates:
+        return []
+    return [dates[0] + timedelta(days=k) for k in range((dates[-1] - dates[0]).days + 1)]
+
+def apply_changes(roster, schedule, shift_types, locations, rules, changes):
+    horizon = horizon_days(schedule)
+    # Change dates are matched to schedule dates by day ordinal
+    date_keys = {date.toordinal(): date for date in horizon}
+    removed = []
+    changed_dates = set()
+
+    def drop(key):
+        if key in schedule and not schedule[key].get('Locked', False):
+            removed.append((key, schedule.pop(key)))
+
+    for day in changes.get('holidays', []):
+        date = date_keys.get(to_ordinal(day))
+        if date is None:
+            continue
+        changed_dates.add(date)
+        for key in [key for key in schedule.keys() if key[1] == date]:
+            drop(key)
+
+    for emp_id, days in changes.get('unavailable', {}).items():
+        for day in days:
+            date = date_keys.get(to_ordinal(day))
+            if date is not None:
+                changed_dates.add(date)
+                drop((emp_id, date))
+
+    locked_emps = set()
+    for lock in changes.get('locks', []):
+        date = date_keys.get(to_ordinal(lock['Date']))
+        if date is None:
+            continue
+        changed_dates.add(date)
+        drop((lock['EmployeeID'], date))
+        schedule[(lock['EmployeeID'], date)] = {
+            'Shift': lock['Shift'],
+            'Location': lock['Location'],
+            'Locked': True
+        }
+        locked_emps.add(lock['EmployeeID'])
+
+    if not changed_dates:
+        return schedule, removed, []
+
+    window = affected_window(changed_dates, rules)
+    holidays = holiday_ordinals(rules) | {to_ordinal(day) for day in changes.get('holidays', [])}
+    window_days = [date for date in horizon if date in window and date.toordinal() not in holidays]
+    if not window_days:
+        return schedule, removed, []
+
+    index = EligibilityIndex(roster, window_days, shift_types, locations, rules, lookahead=True)
+    day_pos = {date.toordinal(): day for day, date in enumerate(window_days)}
+    for emp_id, days in changes.get('unavailable', {}).items():
+        i = index.emp_pos.get(emp_id)
+        for day in map(to_ordinal, days):
+            if i is not None and day in day_pos:
+                index.unavailable[i, day_pos[day]] = True
+
+    # Assignments of a freshly locked employee may now clash with the lock;
+    # re-check them in date order and drop the ones that no longer fit. The
+    # index is synced once and then kept current per assignment
+    index.sync(schedule)
+    for emp_id in locked_emps:
+        i = index.emp_pos.get(emp_id)
+        for date in window_days:
+            key = (emp_id, date)
+            if key not in schedule or schedule[key].get('Locked', False):
+                continue
+            if i is None:
+                removed.append((key, schedule.pop(key)))
+                continue
+            day = day_pos[date.toordinal()]
+            info = schedule[key]
+            index.unassign(schedule, i, day)
+            l = index.loc_pos.get(info['Location'])
+            s = index.shift_pos.get(info['Shift'])
+            if l is None or s is None or not index.can_take(i, day, l, s):
+                removed.append((key, info))
+            else:
+                index.assign(schedule, i, day, info['Location'], info['Shift'])
+
+    # Locks can push a slot past max_staff_per_shift; shed the lowest-ranked
+    # unlocked members
+    for lock in changes.get('locks', []):
+        date = date_keys.get(to_ordinal(lock['Date']))
+        if date is None or lock['Location'] not in locations or lock['Shift'] not in shift_types:
+            continue
+        l, s = locations.index(lock['Location']), shift_types.index(lock['Shift'])
+        excess = schedule.slot_count(date, lock['Location'], lock['Shift']) - rules['max_staff_per_shift']
+        if excess <= 0:
+            continue
+        rank = {index.emp_ids[i]: r for r, i in enumerate(index.order[(l, s)])}
+        members = sorted(
+            (rank.get(emp_id, -1), emp_id) for (emp_id, d), info in schedule.items()
+            if d == date and info['Location'] == lock['Location'] and info['Shift'] == lock['Shift']
+            and not info.get('Locked', False)
+        )
+        for _, emp_id in members[::-1][:excess]:
+            drop((emp_id, date))
+
+    index.sync(schedule)
+    added = []
+    for target in (rules['min_staff_threshold'], rules['max_staff_per_shift']):
+        for day, date in enumerate(window_days):
+            for l, location in enumerate(locations):
+                for s, shift in enumerate(shift_types):
+                    current_count = schedule.slot_count(date, location, shift)
+                    if current_count >= target:
+                        continue
+                    for i in index.fill_slot(schedule, day, l, s, target - current_count):
+                        added.append((index.emp_ids[i], date))
+    return schedule, removed, added
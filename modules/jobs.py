@@ -0,0 +1,102 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from modules.db_manager import get_session_id, use_session
+
+MAX_JOBS = 4
+KEEP_FINISHED = 64
+
+# ----------------------------
+# Background Jobs
+# ----------------------------
+# Runs scheduler calls off the Streamlit script thread, so a long run
+# survives widget reruns and several sessions can solve at once. Jobs share
+# one thread pool per server process and are looked up by id; the page only
+# polls their progress.
+#
+# submit() hands the target a progress callback as progress=. The engine
+# calls it from its date loops and between phases; it records how far the
+# run got and raises JobCancelled once cancel() was requested, which
+# unwinds the run at the next call.
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    def __init__(self, session_id):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.status = 'queued'
+        self.phase = None
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    def progress(self, phase, done, total):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.phase, self.done, self.total = phase, done, total
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def running(self):
+        return self.status in ('queued', 'running')
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _run(self, target, args, kwargs):
+        if self._cancel.is_set():
+            self.status = 'cancelled'
+            return
+        self.status = 'running'
+        self.started = time.perf_counter()
+        try:
+            with use_session(self.session_id):
+                self.result = target(*args, progress=self.progress, **kwargs)
+            self.status = 'done'
+        except JobCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = e
+            self.status = 'failed'
+        finally:
+            self.finished = time.perf_counter()
+
+_executor = ThreadPoolExecutor(max_workers=MAX_JOBS, thread_name_prefix='scheduleme-job')
+_jobs = {}
+_lock = threading.Lock()
+
+def submit(target, *args, **kwargs):
+    job = Job(get_session_id())
+    with _lock:
+        _jobs[job.id] = job
+        finished = [key for key, other in _jobs.items() if not other.running]
+        for key in finished[:max(len(finished) - KEEP_FINISHED, 0)]:
+            del _jobs[key]
+    _executor.submit(job._run, target, args, kwargs)
+    return job.id
+
+def get_job(job_id):
+    with _lock:
+        return _jobs.get(job_id)
+
+def cancel_job(job_id):
+    job = get_job(job_id)
+    if job is not None:
+        job.cancel()
+    return job
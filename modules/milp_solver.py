@@ -0,0 +1,227 @@
+import subprocess
+import time
+import numpy as np
+from modules.eligibility import EligibilityIndex
+from modules.schedule_state import ScheduleState
+
+# Objective weights: closing a gap below min_staff_threshold dominates
+# everything, then filling towards max_staff_per_shift, then preferences,
+# with seniority as a tie-breaker below a single preference point.
+SHORTFALL_WEIGHT = 1000
+FILL_WEIGHT = 10
+SENIORITY_WEIGHT = 0.5
+
+# Variables per slot: the best-ranked candidates, this many per seat
+CANDIDATES_PER_SEAT = 10
+
+# How often a running CBC process checks whether it was cancelled
+POLL_SECONDS = 0.2
+
+# ----------------------------
+# MILP Scheduler
+# ----------------------------
+# Models every scheduling rule as one mixed-integer program and solves it
+# with CBC through PuLP. x[i, day, l, s] is only created where the static
+# rules (work pattern, unavailability, strict preferences) allow it, and
+# assignments already in `existing` are kept as fixed. Understaffing is a
+# penalised slack rather than a hard constraint so the model is always
+# feasible.
+#
+# One variable for every eligible (employee, day, location, shift) does not
+# scale: with soft preferences every employee is eligible everywhere. Each
+# slot only gets the CANDIDATES_PER_SEAT * max_staff_per_shift candidates
+# the greedy passes would rank first, plus whoever warm_start put there.
+#
+# time_limit covers building the model as well as the CBC run. warm_start
+# seeds CBC with a (usually greedy) schedule, projected onto these days; it
+# is only passed on when it satisfies every constraint, since CBC drops an
+# infeasible start. Returns None when the build runs out of time or CBC
+# ends without an integer solution, so the caller can keep its own
+# schedule.
+#
+# check() is called while the model is built and every POLL_SECONDS while
+# CBC runs; raising from it (a cancelled job) kills CBC and aborts the
+# solve.
+
+def solve_milp(roster, schedule_days, shift_types, locations, rules,
+               existing=None, warm_start=None, time_limit=30, check=None):
+    try:
+        import pulp
+    except ImportError as e:
+        raise ImportError("solver='milp' requires PuLP (pip install pulp)") from e
+
+    deadline = time.perf_counter() + time_limit
+    existing = existing if existing is not None else ScheduleState()
+    index = EligibilityIndex(roster, schedule_days, shift_types, locations, rules)
+    index.sync(existing)
+    n = len(index.emp_ids)
+    active_days = [day for day in range(len(schedule_days)) if not index.holiday[day]]
+
+    seniority = np.zeros(n)
+    if rules['use_seniority_weighting'] and n:
+        seniority = SENIORITY_WEIGHT * (n - index.hire_rank) / n
+
+    # warm_start as (day, l, s) -> employee rows, for these days only
+    start = {}
+    if warm_start is not None:
+        day_pos = {date: day for day, date in enumerate(schedule_days)}
+        for (emp_id, date), info in warm_start.items():
+            i = index.emp_pos.get(emp_id)
+            day = day_pos.get(date)
+            l = index.loc_pos.get(info['Location'])
+            s = index.shift_pos.get(info['Shift'])
+            if None not in (i, day, l, s) and (emp_id, date) not in existing:
+                start.setdefault((day, l, s), set()).add(i)
+
+    model = pulp.LpProblem("schedule", pulp.LpMaximize)
+    x = {}
+    objective = []
+    cap = CANDIDATES_PER_SEAT * rules['max_staff_per_shift']
+
+    for day in active_days:
+        if check is not None:
+            check()
+        if time.perf_counter() > deadline:
+            return None
+        d = index.slot_day[day]
+        for s in range(len(shift_types)):
+            open_mask = ~index.scheduled[:, d] & ~index.blocked_by_previous(day, s)
+            for l in range(len(locations)):
+                mask = index.static_mask(day, l, s) & open_mask
+                score = index.scores[(l, s)]
+                order = index.order[(l, s)]
+                ranked = order[mask[order]]
+                rows = set(ranked[:cap].tolist()) | {i for i in start.get((day, l, s), ()) if mask[i]}
+                for i in sorted(rows):
+                    var = pulp.LpVariable(f"x_{i}_{day}_{l}_{s}", cat="Binary")
+                    x[(i, day, l, s)] = var
+                    objective.append((FILL_WEIGHT + score[i] + seniority[i]) * var)
+
+    by_emp_day = {}
+    by_emp_period = {}
+    by_slot = {}
+    for (i, day, l, s), var in x.items():
+        by_emp_day.setdefault((i, day), []).append((s, var))
+        by_emp_period.setdefault((i, index.slot_period[day]), []).append(var)
+        by_slot.setdefault((day, l, s), []).append((i, var))
+
+    # Staffing bounds per slot
+    slack = []
+    for day in active_days:
+        date = schedule_days[day]
+        for l, location in enumerate(locations):
+            for s, shift in enumerate(shift_types):
+                slot_vars = by_slot.get((day, l, s))
+                if not slot_vars:
+                    continue
+                staffed = pulp.lpSum(var for _, var in slot_vars) + existing.slot_count(date, location, shift)
+                model += staffed <= rules['max_staff_per_shift']
+                short = pulp.LpVariable(f"short_{day}_{l}_{s}", lowBound=0)
+                model += short >= rules['min_staff_threshold'] - staffed
+                slack.append((short, rules['min_staff_threshold'] - staffed))
+                objective.append(-SHORTFALL_WEIGHT * short)
+
+                # Required skills, penalised like understaffing
+                for k, count in index.skill_needs.get((l, s), ()):
+                    skilled = pulp.lpSum(var for i, var in slot_vars if index.emp_skill[i, k])
+                    missing = pulp.LpVariable(f"skill_{day}_{l}_{s}_{k}", lowBound=0)
+                    model += missing >= count - skilled - int(index.skill_count[day, l, s, k])
+                    slack.append((missing, count - skilled - int(index.skill_count[day, l, s, k])))
+                    objective.append(-SHORTFALL_WEIGHT * missing)
+
+    # One shift per day and the per-employee cap in each cap period
+    for vars_ in by_emp_day.values():
+        if len(vars_) > 1:
+            model += pulp.lpSum(var for _, var in vars_) <= 1
+    for (i, p), vars_ in by_emp_period.items():
+        model += pulp.lpSum(vars_) <= max(rules['max_shifts_per_employee'] - int(index.assigned[i, p]), 0)
+
+    # Cooldown and no-morning-after-night between consecutive schedule days
+    day_of = {d: day for day, d in enumerate(index.slot_day)}
+    for (i, day), vars_ in by_emp_day.items():
+        prev_day = day_of.get(index.prev_days[day][0])
+        if prev_day is None or (i, prev_day) not in by_emp_day:
+            continue
+        prev_vars = by_emp_day[(i, prev_day)]
+        for s, var in vars_:
+            blocked = [pv for p, pv in prev_vars if index.conflict[p, s]]
+            if blocked:
+                model += pulp.lpSum(blocked) + var <= 1
+
+    # No run longer than max_consecutive_days, counting fixed assignments
+    if rules['enforce_consecutive_day_limit']:
+        limit = rules['max_consecutive_days']
+        for (i, day) in by_emp_day:
+            window = [pulp.lpSum(var for _, var in by_emp_day[(i, day)])]
+            fixed = 0
+            for d in index.prev_days[day][:limit]:
+                if index.scheduled[i, d]:
+                    fixed += 1
+                elif (i, day_of.get(d)) in by_emp_day:
+                    window.append(pulp.lpSum(var for _, var in by_emp_day[(i, day_of[d])]))
+            model += pulp.lpSum(window) + fixed <= limit
+
+    model += pulp.lpSum(objective)
+
+    if time.perf_counter() > deadline:
+        return None
+
+    warm = False
+    if start:
+        for (i, day, l, s), var in x.items():
+            var.setInitialValue(1 if i in start.get((day, l, s), ()) else 0)
+        for var, gap in slack:
+            var.setInitialValue(max(pulp.value(gap), 0))
+        warm = model.valid()
+
+    run_cbc(pulp, model, max(deadline - time.perf_counter(), 1), warm, check)
+    if model.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+        return None
+
+    schedule = existing.copy()
+    for (i, day, l, s), var in x.items():
+        if var.value() is not None and var.value() > 0.5:
+            schedule[(index.emp_ids[i], schedule_days[day])] = {
+                'Shift': shift_types[s],
+                'Location': locations[l],
+                'Locked': False
+            }
+    return schedule
+
+def run_cbc(pulp, model, time_limit, warm_start, check=None):
+    # PULP_CBC_CMD.solve() blocks until CBC exits. With a check() the same
+    # command runs here as a subprocess that is killed once check() raises
+    solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=warm_start)
+    if check is None:
+        model.solve(solver)
+        return
+
+    tmp_mps, tmp_sol, tmp_mst = solver.create_tmp_files(model.name, 'mps', 'sol', 'mst')
+    try:
+        variables, var_names, con_names, _ = model.writeMPS(tmp_mps, rename=1)
+        args = [solver.path, tmp_mps, '-max', '-sec', str(time_limit)]
+        if warm_start:
+            solver.writesol(tmp_mst, model, variables, var_names, con_names)
+            args += ['-mips', tmp_mst]
+        args += ['-solve', '-printingOptions', 'all', '-solution', tmp_sol]
+
+        with subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL) as cbc:
+            try:
+                while True:
+                    try:
+                        returncode = cbc.wait(timeout=POLL_SECONDS)
+                        break
+                    except subprocess.TimeoutExpired:
+                        check()
+            except BaseException:
+                cbc.kill()
+                raise
+        if returncode != 0:
+            raise pulp.PulpSolverError(f"CBC exited with status {returncode}")
+
+        status, values, _, _, _, sol_status = solver.readsol_MPS(tmp_sol, model, variables, var_names, con_names)
+        model.assignVarsVals(values)
+        model.assignStatus(status, sol_status)
+    finally:
+        solver.delete_tmp_files(tmp_mps, tmp_sol, tmp_mst)
@@ -0,0 +1,126 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from modules.roster import Roster
+from modules.schedule_state import ScheduleState
+
+# ----------------------------
+# Worker Pools
+# ----------------------------
+# Runs are started from background job threads, and forking a process
+# while other threads hold locks can deadlock the child, so every process
+# pool in the app spawns its workers.
+
+def process_pool(workers, **kwargs):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), **kwargs)
+
+# ----------------------------
+# Partition Detection
+# ----------------------------
+# With strict location preferences an employee can only ever be placed at
+# one of their preferred locations, so locations that share no staff are
+# independent subproblems. Partitions are the connected components of the
+# location <-> employee preference graph, in active_locations order.
+
+def find_partitions(roster, locations, rules):
+    if rules['location_preference_mode'] != 'strict' or len(locations) < 2:
+        return [(list(locations), list(range(len(roster))))]
+
+    parent = list(range(len(locations)))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    codes = [roster.location_codes.get(loc) for loc in locations]
+    emp_locations = []
+    for e in roster:
+        locs = [l for l, code in enumerate(codes) if code is not None and e.location_mask >> code & 1]
+        emp_locations.append(locs)
+        for l in locs[1:]:
+            parent[find(l)] = find(locs[0])
+
+    groups = {}
+    for l in range(len(locations)):
+        groups.setdefault(find(l), ([], []))[0].append(locations[l])
+    for i, locs in enumerate(emp_locations):
+        if locs:
+            groups[find(locs[0])][1].append(i)
+    return list(groups.values())
+
+# ----------------------------
+# Partitioned Scheduling
+# ----------------------------
+
+def _schedule_partition(employees, roster_locations, roster_shifts, schedule_days,
+                        shift_types, locations, rules, existing, profiled=False):
+    # Runs in a worker process
+    from modules import scheduler_engine
+    from modules.diagnostics import RunProfile
+
+    roster = Roster(employees, roster_locations, roster_shifts)
+    profile = RunProfile() if profiled else None
+    schedule = ScheduleState(existing)
+    # New assignments are appended, so each pass's are the tail of the
+    # schedule since the previous pass
+    passes = []
+    done = len(schedule)
+    for _ in scheduler_engine.schedule_periods(
+        roster, schedule_days, shift_types, locations, rules, schedule, pipeline=False, profile=profile
+    ):
+        entries = list(schedule.items())
+        passes.append(entries[done:])
+        done = len(entries)
+    return passes, profile.to_dict() if profile else None
+
+def schedule_partitioned(roster, schedule_days, shift_types, locations, rules, existing, workers, profile=None,
+                         progress=None):
+    partitions = find_partitions(roster, locations, rules)
+    jobs = []
+    for part_locations, members in partitions:
+        emp_ids = {roster.employees[i].emp_id for i in members}
+        loc_set = set(part_locations)
+        part_existing = {
+            key: info for key, info in existing.items()
+            if key[0] in emp_ids or info['Location'] in loc_set
+        }
+        jobs.append((
+            [roster.employees[i] for i in members], roster.locations, roster.shifts,
+            schedule_days, shift_types, part_locations, rules, part_existing, profile is not None
+        ))
+
+    with process_pool(workers) as pool:
+        futures = [pool.submit(_schedule_partition, *job) for job in jobs]
+        try:
+            if progress is not None:
+                for done, _ in enumerate(as_completed(futures), 1):
+                    progress('partitioned', done, len(futures))
+            results = [future.result() for future in futures]
+        except BaseException:
+            pool.shutdown(cancel_futures=True)
+            raise
+
+    # Worker wall times add up across processes, so per-phase times are CPU
+    # time spent in that phase rather than elapsed time
+    if profile is not None:
+        for result in results:
+            profile.merge(result[1])
+
+    # Replay assignments in the order a serial run makes them: pass by pass
+    # (generate then fill, for each week in rolling-horizon mode), each pass
+    # in date -> location -> shift order, slot members in their pick order
+    day_pos = {date: i for i, date in enumerate(schedule_days)}
+    loc_pos = {loc: i for i, loc in enumerate(locations)}
+    shift_pos = {shift: i for i, shift in enumerate(shift_types)}
+
+    def slot_order(entry):
+        (_, date), info = entry
+        return day_pos[date], loc_pos[info['Location']], shift_pos[info['Shift']]
+
+    schedule = ScheduleState(existing)
+    for k in range(len(results[0][0])):
+        entries = [entry for result in results for entry in result[0][k]]
+        for key, info in sorted(entries, key=slot_order):
+            schedule[key] = info
+    return schedule
@@ -0,0 +1,268 @@
+import os
+import tempfile
+from datetime import date
+import numpy as np
+import pandas as pd
+from modules.roster import Employee, Roster, WEEKDAY_BITS
+
+# date32 counts days since 1970-01-01; adding this gives date.toordinal()
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# ----------------------------
+# Parquet Storage
+# ----------------------------
+# Optional columnar backend for db_manager (STORAGE = "parquet"), one
+# Parquet file per session and kind. Columns use native Arrow types:
+# dates as date32 / timestamp, Shift, Location and SkillLevel dictionary-
+# encoded, and the preference and unavailability lists as list columns, so
+# reading a file is a memory-mapped columnar scan with no JSON or date-string
+# parsing per row. Frames come back in the same shape the SQLite backend
+# returns them; read_roster() skips the frame and builds the Roster's day
+# ordinals and bitmasks straight from the Arrow columns.
+#
+# Files are replaced atomically on every write, each writer through its own
+# temporary file. Requires pyarrow.
+
+def require_arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("STORAGE = 'parquet' requires pyarrow (pip install pyarrow)") from e
+    return pa, pc, pq
+
+def version(*paths):
+    # Stat-based token; changes whenever a file is rewritten
+    token = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            token.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            token.append(None)
+    return tuple(token)
+
+def temp_path(path):
+    # Unique per call, so job threads of one process never share a file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    return tmp
+
+def write_table(path, table):
+    _, _, pq = require_arrow()
+    tmp = temp_path(path)
+    try:
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def read_table(path, columns=None):
+    _, _, pq = require_arrow()
+    if not os.path.exists(path):
+        return None
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+def text_array(values):
+    pa, _, _ = require_arrow()
+    return pa.array([None if pd.isna(val) else str(val) for val in values], type=pa.string())
+
+def category_array(values):
+    pa, _, _ = require_arrow()
+    return text_array(values).dictionary_encode()
+
+def list_array(values, as_values):
+    pa, _, _ = require_arrow()
+    return pa.array([[str(val) for val in as_values(row)] for row in values], type=pa.list_(pa.string()))
+
+def date_list_array(values, as_values):
+    # Unparseable dates are dropped, the same way Roster skips them
+    pa, _, _ = require_arrow()
+    rows = [as_values(row) for row in values]
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    flat = pd.to_datetime(
+        pd.Series([str(val) for row in rows for val in row], dtype=object), errors='coerce', format='mixed'
+    )
+    keep = flat.notna().to_numpy()
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(owner[keep], minlength=len(rows)))])
+    days = pa.array(flat[keep].to_numpy().astype('datetime64[D]'), type=pa.date32())
+    return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), days)
+
+# ----------------------------
+# Employees
+# ----------------------------
+
+def write_employees(path, df, as_values):
+    write_table(path, employees_table(df, as_values))
+
+def write_employee_chunks(path, chunks, as_values):
+    # One row group per chunk, written as it arrives
+    _, _, pq = require_arrow()
+    tmp = temp_path(path)
+    writer = None
+    try:
+        try:
+            for df in chunks:
+                table = employees_table(df, as_values)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is not None:
+            os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    if writer is None:
+        os.remove(tmp)
+        write_employees(path, pd.DataFrame(), as_values)
+
+def employees_table(df, as_values):
+    pa, _, _ = require_arrow()
+
+    def column(name):
+        return df[name] if name in df else [None] * len(df)
+
+    hired = pd.to_datetime(pd.Series(list(column('DateHired')), dtype=object), errors='coerce', format='mixed')
+    return pa.table({
+        'EmployeeID': text_array(column('EmployeeID')),
+        'Name': text_array(column('Name')),
+        'PhoneNumber': text_array(column('PhoneNumber')),
+        'DateHired': pa.array(hired.to_numpy().astype('datetime64[D]'), type=pa.date32(), mask=hired.isna().to_numpy()),
+        'WorkPattern': list_array(column('WorkPattern'), as_values),
+        'PreferredLocations': list_array(column('PreferredLocations'), as_values),
+        'PreferredShifts': list_array(column('PreferredShifts'), as_values),
+        'SkillLevel': category_array(column('SkillLevel')),
+        'UnavailableDates': date_list_array(column('UnavailableDates'), as_values)
+    })
+
+def read_employees(path, columns):
+    pa, pc, _ = require_arrow()
+    table = read_table(path)
+    if table is None or not table.num_rows:
+        return pd.DataFrame(columns=columns)
+
+    unavailable = pc.cast(table['UnavailableDates'], pa.list_(pa.string()))
+    df = pd.DataFrame({
+        'EmployeeID': table['EmployeeID'].to_pylist(),
+        'Name': table['Name'].to_pylist(),
+        'PhoneNumber': table['PhoneNumber'].to_pylist(),
+        'DateHired': pd.to_datetime(table['DateHired'].to_numpy(zero_copy_only=False)),
+        'WorkPattern': table['WorkPattern'].to_pylist(),
+        'PreferredLocations': table['PreferredLocations'].to_pylist(),
+        'PreferredShifts': table['PreferredShifts'].to_pylist(),
+        'SkillLevel': table['SkillLevel'].to_pylist(),
+        'UnavailableDates': unavailable.to_pylist()
+    })
+    return df[columns]
+
+def read_roster(path):
+    # Same records as Roster.from_dataframe(read_employees(...)), without
+    # going through Python dates or strings for the date columns
+    pa, pc, _ = require_arrow()
+    table = read_table(path)
+    if table is None or not table.num_rows:
+        return Roster([], [], [])
+    n = table.num_rows
+
+    hired = table['DateHired'].combine_chunks()
+    hired_days = pc.fill_null(pc.cast(hired, pa.int32()), 0).to_numpy()
+    hired_ok = ~pc.is_null(hired).to_numpy(zero_copy_only=False)
+
+    def masks(name, bits_for):
+        # OR of one bit per list value, per row; bits_for maps the column's
+        # distinct values (in first-seen order) to their bits
+        values = table[name].combine_chunks()
+        owner = pc.list_parent_indices(values).to_numpy()
+        encoded = pc.dictionary_encode(pc.list_flatten(values))
+        bits = bits_for(encoded.dictionary.to_pylist())
+        if len(bits) < 63:
+            out = np.zeros(n, dtype=np.int64)
+            np.bitwise_or.at(out, owner, np.array(bits, dtype=np.int64)[encoded.indices.to_numpy()])
+            return out.tolist()
+        out = [0] * n
+        for i, code in zip(owner.tolist(), encoded.indices.to_numpy().tolist()):
+            out[i] |= bits[code]
+        return out
+
+    location_codes = []
+    shift_codes = []
+
+    def codes(names):
+        def bits_for(values):
+            for val in values:
+                if val not in names:
+                    names.append(val)
+            return [1 << names.index(val) for val in values]
+        return bits_for
+
+    weekday_masks = masks('WorkPattern', lambda values: [WEEKDAY_BITS.get(day, 0) for day in values])
+    location_masks = masks('PreferredLocations', codes(location_codes))
+    shift_masks = masks('PreferredShifts', codes(shift_codes))
+
+    unavailable = table['UnavailableDates'].combine_chunks()
+    owner = pc.list_parent_indices(unavailable).to_numpy()
+    days = pc.cast(pc.list_flatten(unavailable), pa.int32()).to_numpy(zero_copy_only=False) + EPOCH_ORDINAL
+    bounds = np.searchsorted(owner, np.arange(n + 1)).tolist()
+    days = days.tolist()
+
+    employees = [
+        Employee(
+            emp_id=emp_id,
+            name=name,
+            phone=phone,
+            hired=day + EPOCH_ORDINAL if ok else None,
+            skill_level=skill,
+            weekday_mask=weekday_mask,
+            unavailable=frozenset(days[bounds[i]:bounds[i + 1]]),
+            location_mask=location_mask,
+            shift_mask=shift_mask
+        )
+        for i, (emp_id, name, phone, day, ok, skill, weekday_mask, location_mask, shift_mask) in enumerate(zip(
+            table['EmployeeID'].to_pylist(), table['Name'].to_pylist(), table['PhoneNumber'].to_pylist(),
+            hired_days.tolist(), hired_ok.tolist(), table['SkillLevel'].to_pylist(),
+            weekday_masks, location_masks, shift_masks
+        ))
+    ]
+    return Roster(employees, location_codes, shift_codes)
+
+# ----------------------------
+# Schedule
+# ----------------------------
+
+def write_schedule(path, df):
+    pa, _, _ = require_arrow()
+    locked = df['Locked'] if 'Locked' in df else [False] * len(df)
+    table = pa.table({
+        'EmployeeID': category_array(df['EmployeeID']),
+        'Date': pa.array(pd.to_datetime(df['Date']).to_numpy().astype('datetime64[us]'), type=pa.timestamp('us')),
+        'Shift': category_array(df['Shift']),
+        'Location': category_array(df['Location']),
+        'Locked': pa.array([bool(val) for val in locked], type=pa.bool_())
+    })
+    write_table(path, table)
+
+def read_schedule(path, employees_path, columns):
+    table = read_table(path)
+    if table is None:
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in columns}).astype({
+            'Date': 'datetime64[ns]', 'Locked': bool
+        })
+
+    # Names are joined from the roster so renames show up immediately
+    df = table.to_pandas(coerce_temporal_nanoseconds=True)
+    for col in ('EmployeeID', 'Shift', 'Location'):
+        df[col] = df[col].astype(object)
+    names = read_table(employees_path, columns=['EmployeeID', 'Name'])
+    if names is not None:
+        names = names.to_pandas().dropna(subset=['Name']).drop_duplicates('EmployeeID')
+        df['Name'] = df['EmployeeID'].map(names.set_index('EmployeeID')['Name']).fillna('Unknown')
+    else:
+        df['Name'] = 'Unknown'
+    return df[columns]
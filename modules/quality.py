@@ -0,0 +1,120 @@
+from collections import Counter
+from modules.config import holiday_ordinals
+from modules.shifts import shift_codes, conflict_matrices
+from modules.skills import required_skills, slot_requirements
+from modules.roster import as_roster
+
+# ----------------------------
+# Schedule Quality
+# ----------------------------
+# Scores a finished schedule independently of the engine that produced it:
+# coverage against the staffing thresholds and skill requirements,
+# hard-rule violations broken down by rule, preference hit rates and how
+# evenly shifts are spread. Used to show that a faster engine or a
+# different solver did not make schedules worse.
+
+def evaluate_schedule(schedule, roster, schedule_days, shift_types, locations, rules):
+    roster = as_roster(roster)
+    employees = {e.emp_id: e for e in roster}
+    holidays = holiday_ordinals(rules)
+    active_days = [date for date in schedule_days if date.toordinal() not in holidays]
+    # Neighbouring days are looked up by ordinal, one dict built per call
+    shifts = {(emp_id, date.toordinal()): info['Shift'] for (emp_id, date), info in schedule.items()}
+    code_names = shift_codes(shift_types, rules)
+    code_pos = {name: i for i, name in enumerate(code_names)}
+    conflicts = conflict_matrices(code_names, rules)
+
+    violations = Counter()
+    loc_hits = shift_hits = 0
+    per_employee = Counter()
+    per_period = Counter()
+    skills = required_skills(rules)
+    skill_needs = slot_requirements(rules, locations, shift_types)
+    skill_staffed = Counter()
+
+    for (emp_id, date), info in schedule.items():
+        e = employees.get(emp_id)
+        o = date.toordinal()
+        if skill_needs and e is not None:
+            skill_staffed[(o, info['Location'], info['Shift'], e.skill_level)] += 1
+        if o in holidays:
+            violations['holiday'] += 1
+        if e is None:
+            violations['unknown_employee'] += 1
+            continue
+        if not info.get('Locked', False):
+            per_employee[emp_id] += 1
+            per_period[(emp_id, tuple(date.isocalendar()[:2]) if rules['rolling_horizon'] else None)] += 1
+        if rules['enforce_work_pattern'] and not e.works_on(date):
+            violations['work_pattern'] += 1
+        if e.is_unavailable(date):
+            violations['unavailable'] += 1
+
+        loc_code = roster.location_codes.get(info['Location'])
+        shift_code = roster.shift_codes.get(info['Shift'])
+        loc_hit = loc_code is not None and bool(e.location_mask >> loc_code & 1)
+        shift_hit = shift_code is not None and bool(e.shift_mask >> shift_code & 1)
+        loc_hits += loc_hit
+        shift_hits += shift_hit
+        if rules['location_preference_mode'] == 'strict' and not loc_hit:
+            violations['location_preference'] += 1
+        if rules['shift_preference_mode'] == 'strict' and not shift_hit:
+            violations['shift_preference'] += 1
+
+        prev = shifts.get((emp_id, o - 1))
+        if prev is not None:
+            p = code_pos.get(prev, len(code_names) - 1)
+            s = code_pos.get(info['Shift'], len(code_names) - 1)
+            for rule, matrix in conflicts.items():
+                if matrix[p, s]:
+                    violations[rule] += 1
+
+        if rules['enforce_consecutive_day_limit']:
+            limit = rules['max_consecutive_days']
+            streak = 0
+            while streak <= limit and (emp_id, o - streak - 1) in shifts:
+                streak += 1
+            if streak >= limit:
+                violations['consecutive_days'] += 1
+
+    # The cap applies per ISO week in rolling-horizon mode, else to the horizon
+    for count in per_period.values():
+        if count > rules['max_shifts_per_employee']:
+            violations['max_shifts'] += count - rules['max_shifts_per_employee']
+
+    slots = unfilled = shortfall = over = 0
+    staffed = skill_shortfall = 0
+    for date in active_days:
+        for l, location in enumerate(locations):
+            for s, shift in enumerate(shift_types):
+                for k, required in skill_needs.get((l, s), ()):
+                    have = skill_staffed[(date.toordinal(), location, shift, skills[k])]
+                    skill_shortfall += max(required - have, 0)
+                count = schedule.slot_count(date, location, shift)
+                slots += 1
+                staffed += count
+                if count < rules['min_staff_threshold']:
+                    unfilled += 1
+                    shortfall += rules['min_staff_threshold'] - count
+                if count > rules['max_staff_per_shift']:
+                    over += count - rules['max_staff_per_shift']
+    if over:
+        violations['over_capacity'] = over
+
+    assignments = len(schedule)
+    loads = [per_employee.get(e.emp_id, 0) for e in roster]
+    mean_load = sum(loads) / len(loads) if loads else 0.0
+    return {
+        'slots': slots,
+        'assignments': assignments,
+        'unfilled_slots': unfilled,
+        'shortfall': shortfall,
+        'skill_shortfall': skill_shortfall,
+        'fill_rate': staffed / (slots * rules['max_staff_per_shift']) if slots else 0.0,
+        'violations': dict(violations),
+        'total_violations': sum(violations.values()),
+        'location_hit_rate': loc_hits / assignments if assignments else 0.0,
+        'shift_hit_rate': shift_hits / assignments if assignments else 0.0,
+        'shifts_per_employee_mean': mean_load,
+        'shifts_per_employee_std': (sum((x - mean_load) ** 2 for x in loads) / len(loads)) ** 0.5 if loads else 0.0
+    }
@@ -0,0 +1,220 @@
+import random
+import time
+from modules.config import holiday_ordinals
+from modules.eligibility import EligibilityIndex
+
+# Objective weights (lower is better): a gap below min_staff_threshold or
+# a missing required skill dominates, then filling towards
+# max_staff_per_shift, then preference hits and an even spread of shifts.
+# Fairness is the sum of squared shift counts, so handing one shift from
+# an employee with a to one with b changes it by 2 * (b - a) + 2.
+SHORTFALL_WEIGHT = 1000
+FILL_WEIGHT = 10
+PREFERENCE_WEIGHT = 4
+FAIRNESS_WEIGHT = 1
+
+MOVES = ('fill', 'relocate', 'transfer', 'swap')
+
+# ----------------------------
+# Local Search Rebalancer
+# ----------------------------
+# Post-pass over a finished schedule. The greedy passes fill date by date,
+# so senior staff reach max_shifts_per_employee on the first days and later
+# slots go short. This pass repeatedly tries a random local move, keeps it
+# if the objective improves and undoes it otherwise:
+#
+#   fill      add an eligible employee to a slot below max_staff_per_shift
+#   relocate  move one assignment to another slot that needs staff
+#   transfer  hand one assignment to the least-loaded eligible employee
+#   swap      two employees on the same day exchange slots
+#
+# Hard rules are checked only for the one or two employees a move touches.
+# The EligibilityIndex runs with lookahead so every check sees the days on
+# both sides of the slot. Locked assignments and holidays are never touched.
+# The search stops when time_budget runs out, after max_iterations, or once
+# a long run of moves brings no improvement.
+
+def rebalance_schedule(schedule, roster, schedule_days, shift_types, locations, rules,
+                       time_budget=2.0, max_iterations=None, seed=0):
+    start = time.perf_counter()
+    holidays = holiday_ordinals(rules)
+    days = [day for day, date in enumerate(schedule_days) if date.toordinal() not in holidays]
+    stats = {'iterations': 0, 'accepted': dict.fromkeys(MOVES, 0)}
+    if not days or not locations or not shift_types:
+        return schedule, stats
+
+    index = EligibilityIndex(roster, schedule_days, shift_types, locations, rules, lookahead=True)
+    index.sync(schedule)
+    if not len(index.emp_ids):
+        return schedule, stats
+
+    day_pos = {date: day for day, date in enumerate(schedule_days)}
+    loc_pos = {loc: l for l, loc in enumerate(locations)}
+    shift_pos = {shift: s for s, shift in enumerate(shift_types)}
+    slots = [(day, l, s) for day in days for l in range(len(locations)) for s in range(len(shift_types))]
+    counts = {
+        slot: schedule.slot_count(schedule_days[slot[0]], locations[slot[1]], shift_types[slot[2]])
+        for slot in slots
+    }
+    members = {slot: [] for slot in slots}
+    for (emp_id, date), info in schedule.items():
+        if info.get('Locked', False):
+            continue
+        slot = (day_pos.get(date), loc_pos.get(info['Location']), shift_pos.get(info['Shift']))
+        i = index.emp_pos.get(emp_id)
+        if i is not None and slot in members:
+            members[slot].append(i)
+
+    min_staff = rules['min_staff_threshold']
+    max_staff = rules['max_staff_per_shift']
+    loc_weight = PREFERENCE_WEIGHT if rules['location_preference_mode'] == 'soft' else 0
+    shift_weight = PREFERENCE_WEIGHT if rules['shift_preference_mode'] == 'soft' else 0
+    load = index.assigned.sum(axis=1)
+
+    def coverage(count):
+        return SHORTFALL_WEIGHT * max(min_staff - count, 0) - FILL_WEIGHT * min(count, max_staff)
+
+    def preference(i, slot):
+        _, l, s = slot
+        return -(loc_weight * index.loc_pref[i, l] + shift_weight * index.shift_pref[i, s])
+
+    def skill_gap(slot, leave=None, join=None):
+        # Missing required skills in slot with `leave` taken out and `join` added
+        day, l, s = slot
+        counts = index.skill_count[day, l, s]
+        gap = 0
+        for k, count in index.skill_needs.get((l, s), ()):
+            staffed = counts[k]
+            if leave is not None:
+                staffed -= index.emp_skill[leave, k]
+            if join is not None:
+                staffed += index.emp_skill[join, k]
+            gap += max(count - staffed, 0)
+        return SHORTFALL_WEIGHT * gap
+
+    def skill_delta(slot, leave=None, join=None):
+        return skill_gap(slot, leave, join) - skill_gap(slot) if index.skill_needs else 0
+
+    def fairness(i, change):
+        return FAIRNESS_WEIGHT * ((load[i] + change) ** 2 - load[i] ** 2)
+
+    def objective():
+        return (
+            sum(coverage(count) + skill_gap(slot) for slot, count in counts.items())
+            + sum(preference(i, slot) for slot, emps in members.items() for i in emps)
+            + FAIRNESS_WEIGHT * int((load ** 2).sum())
+        )
+
+    def place(i, slot):
+        day, l, s = slot
+        index.assign(schedule, i, day, locations[l], shift_types[s])
+        members[slot].append(i)
+        counts[slot] += 1
+        load[i] += 1
+
+    def unplace(i, slot):
+        index.unassign(schedule, i, slot[0])
+        members[slot].remove(i)
+        counts[slot] -= 1
+        load[i] -= 1
+
+    def try_fill(rng):
+        slot = rng.choice(slots)
+        if counts[slot] >= max_staff:
+            return False
+        candidates = index.candidates(*slot)
+        if not len(candidates):
+            return False
+        i = min(candidates[:16], key=lambda c: (load[c], preference(c, slot)))
+        delta = (
+            coverage(counts[slot] + 1) - coverage(counts[slot]) + preference(i, slot) + fairness(i, 1)
+            + skill_delta(slot, join=i)
+        )
+        if delta >= 0:
+            return False
+        place(i, slot)
+        return True
+
+    def try_relocate(rng):
+        source, target = rng.choice(slots), rng.choice(slots)
+        if source == target or not members[source] or counts[target] >= max_staff:
+            return False
+        i = rng.choice(members[source])
+        delta = (
+            coverage(counts[source] - 1) - coverage(counts[source])
+            + coverage(counts[target] + 1) - coverage(counts[target])
+            + preference(i, target) - preference(i, source)
+            + skill_delta(source, leave=i) + skill_delta(target, join=i)
+        )
+        if delta >= 0:
+            return False
+        unplace(i, source)
+        if index.can_take(i, *target):
+            place(i, target)
+            return True
+        place(i, source)
+        return False
+
+    def try_transfer(rng):
+        slot = rng.choice(slots)
+        if not members[slot]:
+            return False
+        i = rng.choice(members[slot])
+        candidates = index.candidates(*slot)
+        if not len(candidates):
+            return False
+        j = candidates[load[candidates].argmin()]
+        delta = (
+            fairness(i, -1) + fairness(j, 1) + preference(j, slot) - preference(i, slot)
+            + skill_delta(slot, leave=i, join=j)
+        )
+        if load[j] >= load[i] or delta >= 0:
+            return False
+        unplace(i, slot)
+        place(j, slot)
+        return True
+
+    def try_swap(rng):
+        a = rng.choice(slots)
+        b = (a[0], rng.randrange(len(locations)), rng.randrange(len(shift_types)))
+        if a == b or not members[a] or not members[b]:
+            return False
+        i, j = rng.choice(members[a]), rng.choice(members[b])
+        delta = (
+            preference(i, b) + preference(j, a) - preference(i, a) - preference(j, b)
+            + skill_delta(a, leave=i, join=j) + skill_delta(b, leave=j, join=i)
+        )
+        if delta >= 0:
+            return False
+        unplace(i, a)
+        unplace(j, b)
+        if index.can_take(i, *b):
+            place(i, b)
+            if index.can_take(j, *a):
+                place(j, a)
+                return True
+            unplace(i, b)
+        place(i, a)
+        place(j, b)
+        return False
+
+    moves = {'fill': try_fill, 'relocate': try_relocate, 'transfer': try_transfer, 'swap': try_swap}
+    rng = random.Random(seed)
+    stats['score_before'] = int(objective())
+    patience = max(50 * len(slots), 1000)
+    stale = 0
+    deadline = start + time_budget
+    while stale < patience and time.perf_counter() < deadline:
+        if max_iterations is not None and stats['iterations'] >= max_iterations:
+            break
+        stats['iterations'] += 1
+        kind = rng.choice(MOVES)
+        if moves[kind](rng):
+            stats['accepted'][kind] += 1
+            stale = 0
+        else:
+            stale += 1
+
+    stats['score_after'] = int(objective())
+    stats['elapsed'] = time.perf_counter() - start
+    return schedule, stats
@@ -0,0 +1,153 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+from modules import db_manager
+from modules.eligibility import EligibilityIndex
+from modules.schedule_state import ScheduleState
+
+RESULTS_DIR = "results"
+CACHE_BYTES = 256 * 1024 * 1024
+
+# ----------------------------
+# Result Cache
+# ----------------------------
+# Finished schedules stored on disk under data/results, one gzipped JSON
+# file per run, addressed by a fingerprint of everything the result depends
+# on: the parsed roster, the rules, the start date and the solver. Rerunning
+# with unchanged inputs loads the stored schedule instead of solving again.
+# Warm-started runs depend on whichever earlier schedule they were seeded
+# from, and rebalanced ones on the rebalancer's time budget, so both are
+# part of the key and never served to a cold, unbalanced run.
+#
+# Assignments are stored as day offsets from the start date and mapped back
+# onto the caller's schedule_days, so a hit looks exactly like a fresh run.
+# File names start with the start date and roster digest, which lets
+# closest() find earlier runs of the same roster without opening files.
+#
+# A hit touches the file's mtime; once the directory grows past CACHE_BYTES
+# the least recently used files are deleted.
+
+def cache_dir():
+    return os.path.join(db_manager.get_data_dir(), RESULTS_DIR)
+
+def result_key(roster_digest, config, start_date, solver, time_limit=None, warm_start=False):
+    parts = {
+        'roster': roster_digest,
+        'config': config.digest(),
+        'start': start_date.strftime('%Y-%m-%d'),
+        'solver': solver,
+        'time_limit': time_limit if solver == 'milp' else None,
+        'warm_start': bool(warm_start),
+        'rebalance_seconds': config['rebalance_seconds']
+    }
+    text = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def entry_path(roster_digest, start_date, key):
+    name = f"{start_date.strftime('%Y-%m-%d')}_{roster_digest[:16]}_{key[:32]}.json.gz"
+    return os.path.join(cache_dir(), name)
+
+def load_result(path, schedule_days):
+    try:
+        with gzip.open(path, 'rt') as f:
+            rows = json.load(f)['assignments']
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(path)
+
+    schedule = ScheduleState()
+    for emp_id, offset, shift, location, locked in rows:
+        if offset < len(schedule_days):
+            schedule[(emp_id, schedule_days[offset])] = {
+                'Shift': shift,
+                'Location': location,
+                'Locked': bool(locked)
+            }
+    return schedule
+
+def get_result(roster_digest, config, start_date, schedule_days, solver, time_limit=None, warm_start=False):
+    key = result_key(roster_digest, config, start_date, solver, time_limit, warm_start)
+    path = entry_path(roster_digest, start_date, key)
+    return load_result(path, schedule_days) if os.path.exists(path) else None
+
+def put_result(roster_digest, config, start_date, schedule_days, solver, schedule, time_limit=None,
+               warm_start=False):
+    key = result_key(roster_digest, config, start_date, solver, time_limit, warm_start)
+    path = entry_path(roster_digest, start_date, key)
+    day_pos = {date: day for day, date in enumerate(schedule_days)}
+    rows = [
+        [emp_id, day_pos[date], info['Shift'], info['Location'], bool(info.get('Locked', False))]
+        for (emp_id, date), info in schedule.items() if date in day_pos
+    ]
+    os.makedirs(cache_dir(), exist_ok=True)
+    # Write to a temporary file first so readers never see half an entry
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, 'wt') as f:
+        json.dump({
+            'config': config.to_dict(), 'solver': solver, 'warm_start': bool(warm_start), 'assignments': rows
+        }, f)
+    os.replace(tmp, path)
+    evict()
+    return path
+
+def closest(roster_digest, start_date, schedule_days):
+    # Most recently used run of the same roster and start date, under any
+    # rules, for warm starts
+    pattern = os.path.join(cache_dir(), f"{start_date.strftime('%Y-%m-%d')}_{roster_digest[:16]}_*.json.gz")
+    for path in sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True):
+        schedule = load_result(path, schedule_days)
+        if schedule is not None:
+            return schedule
+    return None
+
+def evict(max_bytes=None):
+    max_bytes = CACHE_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for path in glob.glob(os.path.join(cache_dir(), "*.json.gz")):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def clear_results():
+    for path in glob.glob(os.path.join(cache_dir(), "*.json.gz")):
+        os.remove(path)
+
+# ----------------------------
+# Warm Start
+# ----------------------------
+# Keeps the assignments of an earlier run that are still valid under the
+# current rules, in date order, so the greedy passes only have to fill what
+# is left. Slots never go over max_staff_per_shift and holidays are skipped.
+
+def seed_schedule(previous, roster, schedule_days, shift_types, locations, rules, schedule=None):
+    schedule = ScheduleState() if schedule is None else schedule
+    index = EligibilityIndex(roster, schedule_days, shift_types, locations, rules)
+    index.sync(schedule)
+    day_pos = {date: day for day, date in enumerate(schedule_days) if not index.holiday[day]}
+    loc_pos = {loc: l for l, loc in enumerate(locations)}
+    shift_pos = {shift: s for s, shift in enumerate(shift_types)}
+    for (emp_id, date), info in sorted(previous.items(), key=lambda item: item[0][1]):
+        day = day_pos.get(date)
+        i = index.emp_pos.get(emp_id)
+        l = loc_pos.get(info['Location'])
+        s = shift_pos.get(info['Shift'])
+        if day is None or i is None or l is None or s is None:
+            continue
+        if schedule.slot_count(date, info['Location'], info['Shift']) >= rules['max_staff_per_shift']:
+            continue
+        if index.can_take(i, day, l, s):
+            index.assign(schedule, i, day, info['Location'], info['Shift'])
+    return schedule
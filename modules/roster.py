@@ -0,0 +1,178 @@
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WEEKDAY_BITS = {name: 1 << i for i, name in enumerate(WEEKDAYS)}
+
+def as_list(val):
+    if isinstance(val, str):
+        try:
+            val = json.loads(val)
+        except Exception:
+            return []
+    return val if isinstance(val, (list, tuple, set, frozenset)) else []
+
+def to_ordinal(val):
+    try:
+        return pd.Timestamp(val).toordinal()
+    except Exception:
+        return None
+
+# ----------------------------
+# Employee Record
+# ----------------------------
+# Parsed once when the roster is loaded. Work pattern is a weekday bitmask
+# (bit 0 = Monday, matching date.weekday()), unavailable dates are day
+# ordinals, and location/shift preferences are bitmasks over the roster's
+# location/shift codes.
+
+class Employee:
+    __slots__ = (
+        'emp_id', 'name', 'phone', 'hired', 'skill_level',
+        'weekday_mask', 'unavailable', 'location_mask', 'shift_mask'
+    )
+
+    def __init__(self, emp_id, name, phone, hired, skill_level,
+                 weekday_mask, unavailable, location_mask, shift_mask):
+        self.emp_id = emp_id
+        self.name = name
+        self.phone = phone
+        self.hired = hired
+        self.skill_level = skill_level
+        self.weekday_mask = weekday_mask
+        self.unavailable = unavailable
+        self.location_mask = location_mask
+        self.shift_mask = shift_mask
+
+    def works_on(self, date):
+        return bool(self.weekday_mask >> date.weekday() & 1)
+
+    def is_unavailable(self, date):
+        return date.toordinal() in self.unavailable
+
+# ----------------------------
+# Roster
+# ----------------------------
+# Ordered collection of Employee records plus the location/shift code tables
+# their preference bitmasks refer to. The array views feed the scheduler's
+# eligibility tensors without touching strings or JSON again.
+
+class Roster:
+    __slots__ = ('employees', 'locations', 'shifts', 'location_codes', 'shift_codes')
+
+    def __init__(self, employees, locations, shifts):
+        self.employees = employees
+        self.locations = locations
+        self.shifts = shifts
+        self.location_codes = {loc: i for i, loc in enumerate(locations)}
+        self.shift_codes = {shift: i for i, shift in enumerate(shifts)}
+
+    @classmethod
+    def from_dataframe(cls, df):
+        location_codes = {}
+        shift_codes = {}
+
+        def encode(values, codes):
+            mask = 0
+            for val in values:
+                mask |= 1 << codes.setdefault(val, len(codes))
+            return mask
+
+        def column(name, default=None):
+            return df[name] if name in df else [default] * len(df)
+
+        employees = []
+        rows = zip(
+            column('EmployeeID'), column('Name'), column('PhoneNumber'),
+            column('DateHired'), column('SkillLevel'), column('WorkPattern', []),
+            column('PreferredLocations', []), column('PreferredShifts', []),
+            column('UnavailableDates', [])
+        )
+        for emp_id, name, phone, hired, skill, pattern, locs, shifts, unavailable in rows:
+            employees.append(Employee(
+                emp_id=emp_id,
+                name=name,
+                phone=phone,
+                hired=to_ordinal(hired),
+                skill_level=skill,
+                weekday_mask=sum(WEEKDAY_BITS.get(day, 0) for day in set(as_list(pattern))),
+                unavailable=frozenset(filter(None, map(to_ordinal, as_list(unavailable)))),
+                location_mask=encode(as_list(locs), location_codes),
+                shift_mask=encode(as_list(shifts), shift_codes)
+            ))
+        return cls(employees, list(location_codes), list(shift_codes))
+
+    def __len__(self):
+        return len(self.employees)
+
+    def __iter__(self):
+        return iter(self.employees)
+
+    @property
+    def ids(self):
+        return [e.emp_id for e in self.employees]
+
+    @property
+    def names(self):
+        return {e.emp_id: e.name for e in self.employees}
+
+    def digest(self):
+        # Content fingerprint, independent of the order preference codes
+        # were assigned in. Employee order is kept since it breaks
+        # seniority ties.
+        h = hashlib.sha256()
+        for e in self.employees:
+            row = [
+                e.emp_id, e.name, e.phone, e.hired, e.skill_level, e.weekday_mask, sorted(e.unavailable),
+                sorted(loc for code, loc in enumerate(self.locations) if e.location_mask >> code & 1),
+                sorted(shift for code, shift in enumerate(self.shifts) if e.shift_mask >> code & 1)
+            ]
+            h.update(json.dumps(row, default=str).encode())
+            h.update(b'\n')
+        return h.hexdigest()
+
+    # ----------------------------
+    # Array views
+    # ----------------------------
+
+    def weekday_matrix(self):
+        masks = np.fromiter((e.weekday_mask for e in self.employees), dtype=np.int64, count=len(self))
+        return (masks[:, None] >> np.arange(7)) & 1 == 1
+
+    def preference_matrix(self, values, kind):
+        codes = self.location_codes if kind == 'location' else self.shift_codes
+        attr = 'location_mask' if kind == 'location' else 'shift_mask'
+        masks = np.fromiter((getattr(e, attr) for e in self.employees), dtype=object, count=len(self))
+        matrix = np.zeros((len(self), len(values)), dtype=bool)
+        for j, val in enumerate(values):
+            if val in codes:
+                matrix[:, j] = (masks & (1 << codes[val])).astype(bool)
+        return matrix
+
+    def skill_matrix(self, skills):
+        levels = np.array([e.skill_level for e in self.employees], dtype=object)
+        return np.stack([levels == skill for skill in skills], axis=1) if skills else np.zeros((len(self), 0), dtype=bool)
+
+    def unavailability_matrix(self, ordinals):
+        pos = {o: j for j, o in enumerate(ordinals)}
+        matrix = np.zeros((len(self), len(ordinals)), dtype=bool)
+        for i, e in enumerate(self.employees):
+            for o in e.unavailable:
+                j = pos.get(o)
+                if j is not None:
+                    matrix[i, j] = True
+        return matrix
+
+    def hire_rank(self):
+        hired = np.fromiter(
+            (e.hired if e.hired is not None else -1 for e in self.employees),
+            dtype=np.int64, count=len(self)
+        )
+        rank = np.empty(len(self), dtype=np.int64)
+        rank[np.argsort(hired, kind='stable')] = np.arange(len(self))
+        return rank
+
+def as_roster(employees):
+    return employees if isinstance(employees, Roster) else Roster.from_dataframe(employees)
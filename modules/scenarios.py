@@ -0,0 +1,73 @@
+import os
+import time
+import pandas as pd
+from datetime import timedelta
+from modules.parallel import process_pool
+from modules.schedule_state import ScheduleState
+
+# ----------------------------
+# What-if Scenarios
+# ----------------------------
+# Runs the same roster under several rule variants and compares the
+# outcomes without touching the saved schedule. The roster is parsed once
+# and shipped to each worker process once (pool initializer); every
+# scenario then builds its own index, since preference modes, cooldowns
+# and caps all change it, runs the greedy passes (plus the rebalancer if
+# its rules ask for it) and is scored with evaluate_schedule.
+#
+# scenarios maps a scenario name to the rules it overrides in the base
+# SchedulerConfig:
+#   {'Baseline': {}, 'Min 2': {'min_staff_threshold': 2}, ...}
+
+_roster = None
+
+def _init_worker(roster):
+    global _roster
+    _roster = roster
+
+def _run_scenario(name, rules, start_date):
+    # Runs in a worker process
+    from modules import scheduler_engine
+    from modules.quality import evaluate_schedule
+    from modules.rebalance import rebalance_schedule
+
+    start = time.perf_counter()
+    schedule_days = [start_date + timedelta(days=i) for i in range(rules['schedule_days'])]
+    schedule = ScheduleState()
+    for _ in scheduler_engine.schedule_periods(
+        _roster, schedule_days, rules['shift_types'], rules['active_locations'], rules, schedule, pipeline=False
+    ):
+        pass
+    if rules['rebalance_seconds'] > 0:
+        schedule, _ = rebalance_schedule(
+            schedule, _roster, schedule_days, rules['shift_types'], rules['active_locations'], rules,
+            time_budget=rules['rebalance_seconds']
+        )
+    runtime = time.perf_counter() - start
+
+    quality = evaluate_schedule(schedule, _roster, schedule_days, rules['shift_types'], rules['active_locations'], rules)
+    return {
+        'Scenario': name,
+        'Runtime (s)': round(runtime, 3),
+        'Assignments': quality['assignments'],
+        'Unfilled Slots': quality['unfilled_slots'],
+        'Shortfall': quality['shortfall'],
+        'Skill Shortfall': quality['skill_shortfall'],
+        'Fill Rate': round(quality['fill_rate'], 3),
+        'Violations': quality['total_violations'],
+        'Location Hit Rate': round(quality['location_hit_rate'], 3),
+        'Shift Hit Rate': round(quality['shift_hit_rate'], 3),
+        'Shifts per Employee (std)': round(quality['shifts_per_employee_std'], 3)
+    }
+
+def run_scenarios(roster, scenarios, base_config, workers=None, start_date=None):
+    if not scenarios:
+        return pd.DataFrame()
+    from modules.scheduler_engine import start_of_day
+    start_date = start_of_day(start_date)
+    workers = max(min(workers or os.cpu_count() or 1, len(scenarios)), 1)
+    jobs = [(name, base_config.replace(**overrides), start_date) for name, overrides in scenarios.items()]
+
+    with process_pool(workers, initializer=_init_worker, initargs=(roster,)) as pool:
+        rows = list(pool.map(_run_scenario, *zip(*jobs)))
+    return pd.DataFrame(rows)
@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+# ----------------------------
+# Schedule State
+# ----------------------------
+# Drop-in replacement for the bare {(emp_id, date): {...}} schedule dict.
+# Entries are stored exactly as before, but every write also maintains a
+# headcount per (date, location, shift) so coverage lookups never have to
+# scan the whole schedule. Per-employee state lives in the EligibilityIndex
+# arrays. Entries must be replaced through assignment (state[key] = {...}),
+# never mutated in place, or the counts go stale.
+
+class ScheduleState:
+    def __init__(self, entries=None):
+        self._entries = {}
+        self._slot_counts = defaultdict(int)  # (date, location, shift) -> headcount
+        if entries:
+            for key, info in entries.items():
+                self[key] = info
+
+    @classmethod
+    def from_dataframe(cls, df):
+        state = cls()
+        for row in df.itertuples(index=False):
+            state[(row.EmployeeID, row.Date)] = {
+                'Shift': row.Shift,
+                'Location': row.Location,
+                'Locked': getattr(row, 'Locked', False)
+            }
+        return state
+
+    # ----------------------------
+    # Mapping interface
+    # ----------------------------
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getitem__(self, key):
+        return self._entries[key]
+
+    def __setitem__(self, key, info):
+        if key in self._entries:
+            self._unindex(key, self._entries[key])
+        self._entries[key] = info
+        self._index(key, info)
+
+    def __delitem__(self, key):
+        self._unindex(key, self._entries.pop(key))
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        return self._entries.get(key, default)
+
+    def pop(self, key, *default):
+        if key not in self._entries:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        info = self._entries[key]
+        del self[key]
+        return info
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self):
+        return self._entries.values()
+
+    def items(self):
+        return self._entries.items()
+
+    def copy(self):
+        return ScheduleState(self._entries)
+
+    # ----------------------------
+    # Indexed queries
+    # ----------------------------
+
+    def slot_count(self, date, location, shift):
+        return self._slot_counts.get((date, location, shift), 0)
+
+    # ----------------------------
+    # Index maintenance
+    # ----------------------------
+
+    def _index(self, key, info):
+        self._slot_counts[(key[1], info['Location'], info['Shift'])] += 1
+
+    def _unindex(self, key, info):
+        slot = (key[1], info['Location'], info['Shift'])
+        self._slot_counts[slot] -= 1
+        if not self._slot_counts[slot]:
+            del self._slot_counts[slot]
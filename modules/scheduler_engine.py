@@ -1,267 +1,337 @@
+import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import json
-from modules.db_manager import load_employees, save_schedule, load_schedule
+from modules.db_manager import load_roster, load_employees, save_employees, save_schedule, load_schedule
+from modules.schedule_state import ScheduleState
+from modules.roster import Roster
+from modules.eligibility import EligibilityIndex
+from modules.parallel import find_partitions, schedule_partitioned
+from modules.incremental import apply_changes
+from modules.diagnostics import timed
+from modules.rebalance import rebalance_schedule
+from modules.scenarios import run_scenarios
+from modules.result_cache import get_result, put_result, closest, seed_schedule
+from modules.config import SchedulerConfig, get_session_config, set_session_config
 
 # ----------------------------
 # Configuration
 # ----------------------------
+# Rules travel with each call as a SchedulerConfig (modules/config.py);
+# functions fall back to the defaults when none is given.
 
-RULES = {
-    'enforce_work_pattern': True,
-    'enforce_max_one_shift_per_day': True,
-    'enforce_no_morning_after_night': True,
-    'shift_preference_mode': 'soft',
-    'location_preference_mode': 'soft',
-    'use_seniority_weighting': True,
-
-    'enforce_consecutive_day_limit': True,
-    'max_consecutive_days': 5,
-    'enforce_shift_cooldown': True,
-    'min_hours_between_shifts': 12,
-
-    'min_staff_threshold': 1,
-    'max_staff_per_shift': 3,
-    'max_shifts_per_employee': 5,
-    'shift_types': ['Morning', 'Afternoon', 'Night'],
-    'schedule_days': 7,
-    'active_locations': ["ZoneA", "ZoneB", "ZoneC"],
-    'holiday_dates': []
-}
+DEFAULT_CONFIG = SchedulerConfig()
 
 # ----------------------------
-# Helpers
+# Main Scheduler
 # ----------------------------
 
-def is_working_today(employee, date):
-    return date.strftime('%A') in employee['WorkPattern'] if RULES['enforce_work_pattern'] else True
-
-def is_unavailable(employee, date):
-    try:
-        return date.strftime('%Y-%m-%d') in json.loads(employee.get("UnavailableDates", "[]"))
-    except Exception:
-        return False
-
-def get_assigned_shift(schedule, emp_id, date):
-    return schedule.get((emp_id, date), {}).get('Shift')
+def generate_schedule(roster, schedule_days, shift_types, locations, eligibility=None, schedule=None,
+                      profile=None, config=None, progress=None):
+    config = DEFAULT_CONFIG if config is None else config
+    if schedule is None:
+        existing_schedule_df = load_schedule()
+        schedule = ScheduleState.from_dataframe(existing_schedule_df)
+
+    if eligibility is None:
+        eligibility = EligibilityIndex(roster, schedule_days, shift_types, locations, config, lookahead=True)
+    eligibility.sync(schedule)
+
+    for day, date in enumerate(schedule_days):
+        if progress is not None:
+            progress('generate', day, len(schedule_days))
+        if eligibility.holiday[day]:
+            continue
 
-def is_locked(schedule, emp_id, date):
-    return schedule.get((emp_id, date), {}).get('Locked', False)
+        for l, location in enumerate(locations):
+            for s, shift in enumerate(shift_types):
+                current_count = schedule.slot_count(date, location, shift)
+                if current_count >= config['min_staff_threshold']:
+                    continue
 
-def get_last_shift_datetime(schedule, emp_id, date):
-    prev_day = date - timedelta(days=1)
-    prev_shift = get_assigned_shift(schedule, emp_id, prev_day)
-    shift_hours = {'Morning': 8, 'Afternoon': 16, 'Night': 22}
-    return datetime.combine(prev_day, datetime.min.time()) + timedelta(hours=shift_hours.get(prev_shift, 0)) if prev_shift else None
+                if profile is not None:
+                    profile.record('generate', date, location, shift, len(eligibility.emp_ids),
+                                   eligibility.rejections(day, l, s))
 
-def is_already_scheduled(schedule, emp_id, date):
-    return (emp_id, date) in schedule
+                picked = eligibility.fill_slot(schedule, day, l, s, config['min_staff_threshold'] - current_count)
 
-def count_weekly_assignments(schedule, emp_id):
-    return sum(1 for (e, _), v in schedule.items() if e == emp_id and not v.get('Locked', False))
+                if profile is not None:
+                    profile.record_assigned('generate', date, location, shift, len(picked), current_count + len(picked))
 
-def count_consecutive_days(schedule, emp_id, current_date):
-    count = 0
-    for i in range(1, RULES['max_consecutive_days'] + 2):
-        if (emp_id, current_date - timedelta(days=i)) in schedule:
-            count += 1
-        else:
-            break
-    return count
+    return schedule
 
 # ----------------------------
-# Main Scheduler
+# Fill Gaps
 # ----------------------------
 
-def generate_schedule(employees_df, schedule_days, shift_types, locations):
-    existing_schedule_df = load_schedule()
-    schedule = {
-        (row['EmployeeID'], row['Date']): {
-            'Shift': row['Shift'],
-            'Location': row['Location'],
-            'Locked': row.get('Locked', False)
-        } for _, row in existing_schedule_df.iterrows()
-    }
-
-    for date in schedule_days:
-        if date.strftime('%Y-%m-%d') in RULES['holiday_dates']:
+def fill_schedule_gaps(schedule, roster, schedule_days, shift_types, locations, eligibility=None,
+                       profile=None, config=None, progress=None):
+    config = DEFAULT_CONFIG if config is None else config
+    if eligibility is None:
+        eligibility = EligibilityIndex(roster, schedule_days, shift_types, locations, config, lookahead=True)
+    eligibility.sync(schedule)
+
+    for day, date in enumerate(schedule_days):
+        if progress is not None:
+            progress('fill', day, len(schedule_days))
+        if eligibility.holiday[day]:
             continue
 
-        for location in locations:
-            for shift in shift_types:
-                current_count = sum(
-                    1 for (eid, d), val in schedule.items()
-                    if d == date and val['Shift'] == shift and val['Location'] == location
-                )
-                if current_count >= RULES['min_staff_threshold']:
+        for l, location in enumerate(locations):
+            for s, shift in enumerate(shift_types):
+                current_count = schedule.slot_count(date, location, shift)
+                if current_count >= config['max_staff_per_shift']:
                     continue
 
-                candidates = []
-
-                for _, emp in employees_df.iterrows():
-                    emp_id = emp['EmployeeID']
-                    if is_locked(schedule, emp_id, date): continue
-                    if not is_working_today(emp, date): continue
-                    if is_unavailable(emp, date): continue
-                    if RULES['enforce_max_one_shift_per_day'] and is_already_scheduled(schedule, emp_id, date): continue
-                    if count_weekly_assignments(schedule, emp_id) >= RULES['max_shifts_per_employee']: continue
-
-                    loc_mode = RULES['location_preference_mode']
-                    if loc_mode == 'strict' and location not in emp['PreferredLocations']:
-                        continue
-
-                    shift_mode = RULES['shift_preference_mode']
-                    if shift_mode == 'strict' and shift not in emp['PreferredShifts']:
-                        continue
-
-                    prev_shift = get_assigned_shift(schedule, emp_id, date - timedelta(days=1))
-                    if RULES['enforce_no_morning_after_night'] and shift == 'Morning' and prev_shift == 'Night':
-                        continue
-
-                    if RULES['enforce_consecutive_day_limit']:
-                        if count_consecutive_days(schedule, emp_id, date) >= RULES['max_consecutive_days']:
-                            continue
-
-                    if RULES['enforce_shift_cooldown']:
-                        last_shift_time = get_last_shift_datetime(schedule, emp_id, date)
-                        if last_shift_time:
-                            current_time = datetime.combine(date, datetime.min.time()) + timedelta(
-                                hours={'Morning': 8, 'Afternoon': 16, 'Night': 22}[shift])
-                            if (current_time - last_shift_time).total_seconds() < RULES['min_hours_between_shifts'] * 3600:
-                                continue
-
-                    score = 0
-                    if location in emp['PreferredLocations']:
-                        score += 1
-                    elif loc_mode == 'soft':
-                        score -= 1
-
-                    if shift in emp['PreferredShifts']:
-                        score += 1
-                    elif shift_mode == 'soft':
-                        score -= 1
-
-                    candidates.append((score, emp['DateHired'], emp))
-
-                candidates.sort(key=lambda x: (-x[0], x[1]) if RULES['use_seniority_weighting'] else (0, x[1]))
-
-                for _, _, emp in candidates:
-                    emp_id = emp['EmployeeID']
-                    if (emp_id, date) in schedule:
-                        continue
-                    schedule[(emp_id, date)] = {
-                        'Shift': shift,
-                        'Location': location,
-                        'Locked': False
-                    }
-                    current_count += 1
-                    if current_count >= RULES['min_staff_threshold']:
-                        break
+                if profile is not None:
+                    profile.record('fill', date, location, shift, len(eligibility.emp_ids),
+                                   eligibility.rejections(day, l, s))
 
-    return schedule
+                # All remaining capacity in one pass: taking the best candidate
+                # only changes that employee's row, so the rest of the ranked
+                # list stays valid and does not need rebuilding per pick
+                picked = eligibility.fill_slot(schedule, day, l, s, config['max_staff_per_shift'] - current_count)
+
+                if profile is not None:
+                    profile.record_assigned('fill', date, location, shift, len(picked), current_count + len(picked))
 
 # ----------------------------
-# Fill Gaps
+# Rolling Horizon
 # ----------------------------
-
-def fill_schedule_gaps(schedule, employees_df, schedule_days, shift_types, locations):
+# With config['rolling_horizon'] the horizon is solved one ISO week at a
+# time, each week against its own small EligibilityIndex. Streaks and the
+# last shift carry over because every index looks back into the weeks
+# already placed in the schedule; the shift cap restarts each week. Memory
+# and time grow linearly with the number of weeks. With pipeline=True the
+# next week's index (which depends only on the roster) is built on a
+# background thread while the current week is being filled.
+#
+# schedule_periods() yields after every pass so callers can see which
+# assignments each pass made; without rolling_horizon it is a single
+# generate + fill over the whole horizon.
+
+def split_weeks(schedule_days):
+    weeks = []
     for date in schedule_days:
-        if date.strftime('%Y-%m-%d') in RULES['holiday_dates']:
-            continue
-
-        for location in locations:
-            for shift in shift_types:
-                current_count = sum(
-                    1 for (eid, d), v in schedule.items()
-                    if d == date and v['Shift'] == shift and v['Location'] == location
-                )
-
-                while current_count < RULES['max_staff_per_shift']:
-                    candidates = []
-
-                    for _, emp in employees_df.iterrows():
-                        emp_id = emp['EmployeeID']
-                        if (emp_id, date) in schedule:
-                            continue
-                        if is_locked(schedule, emp_id, date): continue
-                        if not is_working_today(emp, date): continue
-                        if is_unavailable(emp, date): continue
-                        if RULES['enforce_max_one_shift_per_day'] and is_already_scheduled(schedule, emp_id, date): continue
-                        if count_weekly_assignments(schedule, emp_id) >= RULES['max_shifts_per_employee']: continue
-
-                        loc_mode = RULES['location_preference_mode']
-                        if loc_mode == 'strict' and location not in emp['PreferredLocations']:
-                            continue
-
-                        shift_mode = RULES['shift_preference_mode']
-                        if shift_mode == 'strict' and shift not in emp['PreferredShifts']:
-                            continue
-
-                        prev_shift = get_assigned_shift(schedule, emp_id, date - timedelta(days=1))
-                        if RULES['enforce_no_morning_after_night'] and shift == 'Morning' and prev_shift == 'Night':
-                            continue
-
-                        if RULES['enforce_consecutive_day_limit']:
-                            if count_consecutive_days(schedule, emp_id, date) >= RULES['max_consecutive_days']:
-                                continue
-
-                        if RULES['enforce_shift_cooldown']:
-                            last_shift_time = get_last_shift_datetime(schedule, emp_id, date)
-                            if last_shift_time:
-                                current_time = datetime.combine(date, datetime.min.time()) + timedelta(
-                                    hours={'Morning': 8, 'Afternoon': 16, 'Night': 22}[shift])
-                                if (current_time - last_shift_time).total_seconds() < RULES['min_hours_between_shifts'] * 3600:
-                                    continue
-
-                        score = 0
-                        if location in emp['PreferredLocations']:
-                            score += 1
-                        elif loc_mode == 'soft':
-                            score -= 1
-
-                        if shift in emp['PreferredShifts']:
-                            score += 1
-                        elif shift_mode == 'soft':
-                            score -= 1
-
-                        candidates.append((score, emp['DateHired'], emp))
-
-                    if not candidates:
-                        break
-
-                    candidates.sort(key=lambda x: (-x[0], x[1]) if RULES['use_seniority_weighting'] else (0, x[1]))
-                    _, _, chosen = candidates[0]
-                    schedule[(chosen['EmployeeID'], date)] = {
-                        'Shift': shift,
-                        'Location': location,
-                        'Locked': False
-                    }
-                    current_count += 1
+        week = tuple(date.isocalendar()[:2])
+        if not weeks or weeks[-1][0] != week:
+            weeks.append((week, []))
+        weeks[-1][1].append(date)
+    return weeks
+
+def schedule_periods(roster, schedule_days, shift_types, locations, config, schedule, pipeline=True, profile=None,
+                     progress=None):
+    if config['rolling_horizon']:
+        periods = [days for _, days in split_weeks(schedule_days)]
+    else:
+        periods = [list(schedule_days)]
+
+    def build(days):
+        return EligibilityIndex(roster, days, shift_types, locations, config, lookahead=True)
+
+    executor = ThreadPoolExecutor(max_workers=1) if pipeline and len(periods) > 1 else None
+    try:
+        pending = executor.submit(build, periods[0]) if executor else None
+        for k, days in enumerate(periods):
+            with timed(profile, 'index_build'):
+                eligibility = pending.result() if executor else build(days)
+            if executor and k + 1 < len(periods):
+                pending = executor.submit(build, periods[k + 1])
+
+            with timed(profile, 'generate'):
+                generate_schedule(roster, days, shift_types, locations, eligibility, schedule, profile, config, progress)
+            yield 'generate'
+            with timed(profile, 'fill'):
+                fill_schedule_gaps(schedule, roster, days, shift_types, locations, eligibility, profile, config, progress)
+            yield 'fill'
+    finally:
+        if executor:
+            executor.shutdown()
 
 # ----------------------------
 # Entry Point
 # ----------------------------
 
-def run_scheduler():
-    employees = load_employees()
-    employees['DateHired'] = pd.to_datetime(employees['DateHired'])
-
-    def safe_json_load(x): return json.loads(x) if isinstance(x, str) else x
-    for col in ['WorkPattern', 'PreferredLocations', 'PreferredShifts']:
-        employees[col] = employees[col].apply(safe_json_load)
-
-    save_schedule(pd.DataFrame(columns=['EmployeeID', 'Date', 'Shift', 'Location', 'Locked']))
-
-    start_date = datetime.today()
-    schedule_days = [start_date + timedelta(days=i) for i in range(RULES['schedule_days'])]
+SOLVERS = ('greedy', 'milp')
+
+def start_of_day(start_date=None):
+    # Days start at midnight so schedule keys match the dates read back
+    start_date = datetime.today() if start_date is None else start_date
+    return datetime(start_date.year, start_date.month, start_date.day)
+
+def schedule_horizon(start_date, config):
+    return [start_date + timedelta(days=i) for i in range(config['schedule_days'])]
+
+def improve_with_milp(roster, schedule_days, config, greedy, time_limit, progress=None):
+    # One small model per ISO week and independent location group, solved in
+    # order with everything before it fixed. The time limit covers the whole
+    # run, building included; each sub-solve gets an even share of what is
+    # left. The greedy schedule warm-starts every model and is returned
+    # instead whenever a sub-solve finds nothing in time or the result covers
+    # fewer slots, so the MILP path is never worse than greedy. progress is
+    # also polled while each model is built and solved, so cancelling a job
+    # stops CBC instead of waiting out the time limit.
+    from modules.milp_solver import solve_milp
+    from modules.quality import evaluate_schedule
+    shift_types, locations = config['shift_types'], config['active_locations']
+    deadline = time.perf_counter() + time_limit
+    groups = [
+        (part_locations, roster if len(members) == len(roster) else
+         Roster([roster.employees[i] for i in members], roster.locations, roster.shifts))
+        for part_locations, members in find_partitions(roster, locations, config)
+    ]
+    parts = [(days, part_locations, part_roster)
+             for _, days in split_weeks(schedule_days) for part_locations, part_roster in groups]
+
+    solved = ScheduleState()
+    for k, (days, part_locations, part_roster) in enumerate(parts):
+        if progress is not None:
+            progress('milp', k, len(parts))
+        share = (deadline - time.perf_counter()) / (len(parts) - k)
+        if share <= 0:
+            return greedy
+        check = None if progress is None else lambda: progress('milp', k, len(parts))
+        result = solve_milp(
+            part_roster, days, shift_types, part_locations, config,
+            existing=solved, warm_start=greedy, time_limit=share, check=check
+        )
+        if result is None:
+            return greedy
+        solved = result
+
+    def coverage(schedule):
+        quality = evaluate_schedule(schedule, roster, schedule_days, shift_types, locations, config)
+        return quality['shortfall'] + quality['skill_shortfall'], -quality['assignments']
+
+    return solved if coverage(solved) <= coverage(greedy) else greedy
+
+def solve_schedule(roster, schedule_days, config, solver='greedy', time_limit=30, workers=1, existing=None,
+                   profile=None, progress=None):
+    # Everything between loading the roster and saving the result: greedy
+    # passes (partitioned across processes when workers > 1), the optional
+    # MILP solve and the rebalancing pass. Touches no storage, so it can be
+    # driven from batch runs as well as the app.
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver}', expected one of {SOLVERS}")
+    existing = ScheduleState() if existing is None else existing
+    partitions = find_partitions(roster, config['active_locations'], config) if workers > 1 else []
+    if len(partitions) > 1:
+        with timed(profile, 'partitioned'):
+            schedule_dict = schedule_partitioned(
+                roster, schedule_days, config['shift_types'], config['active_locations'], config,
+                existing, workers, profile=profile, progress=progress
+            )
+    else:
+        schedule_dict = existing
+        for _ in schedule_periods(
+            roster, schedule_days, config['shift_types'], config['active_locations'], config, schedule_dict,
+            profile=profile, progress=progress
+        ):
+            pass
+
+    if solver == 'milp':
+        with timed(profile, 'milp'):
+            schedule_dict = improve_with_milp(roster, schedule_days, config, schedule_dict, time_limit, progress)
+
+    if config['rebalance_seconds'] > 0:
+        if progress is not None:
+            progress('rebalance', 0, 1)
+        with timed(profile, 'rebalance'):
+            schedule_dict, _ = rebalance_schedule(
+                schedule_dict, roster, schedule_days, config['shift_types'], config['active_locations'], config,
+                time_budget=config['rebalance_seconds']
+            )
+    return schedule_dict
+
+def run_scheduler(config=None, solver='greedy', time_limit=30, workers=None, profile=None,
+                  use_cache=True, warm_start=False, progress=None):
+    # Returns True when the schedule came from the result cache. Every run
+    # starts from an empty schedule, but the stored one is only replaced at
+    # the end, so a cancelled or failed run leaves the previous one intact.
+    # progress(phase, done, total) is called as the run advances; raising
+    # from it aborts the run.
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver}', expected one of {SOLVERS}")
+    config = get_session_config() if config is None else config
+    workers = workers or config['parallel_workers']
+
+    with timed(profile, 'load'):
+        roster = load_roster()
+
+    start_date = start_of_day()
+    schedule_days = schedule_horizon(start_date, config)
+    roster_digest = roster.digest() if use_cache or warm_start else None
+
+    if use_cache:
+        with timed(profile, 'cache'):
+            cached = get_result(roster_digest, config, start_date, schedule_days, solver, time_limit, warm_start)
+        if cached is not None:
+            if progress is not None:
+                progress('save', 0, 1)
+            with timed(profile, 'save'):
+                save_schedule(schedule_to_dataframe(cached, roster))
+            return True
+
+    existing = ScheduleState()
+    if warm_start:
+        with timed(profile, 'warm_start'):
+            previous = closest(roster_digest, start_date, schedule_days)
+            if previous is not None:
+                seed_schedule(
+                    previous, roster, schedule_days, config['shift_types'], config['active_locations'], config,
+                    schedule=existing
+                )
 
-    schedule_dict = generate_schedule(employees, schedule_days, RULES['shift_types'], RULES['active_locations'])
-    fill_schedule_gaps(schedule_dict, employees, schedule_days, RULES['shift_types'], RULES['active_locations'])
-    
+    schedule_dict = solve_schedule(
+        roster, schedule_days, config, solver, time_limit, workers, existing, profile=profile, progress=progress
+    )
+
+    if progress is not None:
+        progress('save', 0, 1)
+    with timed(profile, 'save'):
+        save_schedule(schedule_to_dataframe(schedule_dict, roster))
+        if use_cache:
+            put_result(roster_digest, config, start_date, schedule_days, solver, schedule_dict, time_limit, warm_start)
+    return False
+
+def run_incremental(changes, config=None):
+    # Persist the change itself so later runs see it too. New holidays go
+    # into the returned config; only a session config is updated in place,
+    # so callers passing their own config never touch streamlit.
+    session = config is None
+    config = get_session_config() if session else config
+    new_holidays = [day for day in changes.get('holidays', []) if day not in config['holiday_dates']]
+    if new_holidays:
+        config = config.replace(holiday_dates=config['holiday_dates'] + tuple(new_holidays))
+        if session:
+            set_session_config(config)
+    if changes.get('unavailable'):
+        employees = load_employees()
+        for emp_id, days in changes['unavailable'].items():
+            mask = employees['EmployeeID'] == emp_id
+            employees.loc[mask, 'UnavailableDates'] = employees.loc[mask, 'UnavailableDates'].apply(
+                lambda val: sorted(set(val) | set(days))
+            )
+        save_employees(employees)
+
+    roster = load_roster()
+    schedule = ScheduleState.from_dataframe(load_schedule())
+    schedule, removed, added = apply_changes(
+        roster, schedule, config['shift_types'], config['active_locations'], config, changes
+    )
+    save_schedule(schedule_to_dataframe(schedule, roster))
+    return removed, added, config
+
+def run_what_if(scenarios, config=None, workers=None):
+    # Compares rule variants against the current roster; nothing is saved
+    config = get_session_config() if config is None else config
+    return run_scenarios(load_roster(), scenarios, config, workers=workers)
+
+def schedule_to_dataframe(schedule_dict, roster):
     # Create a mapping from EmployeeID to FullName
-    id_to_name = dict(zip(employees['EmployeeID'], employees['Name']))
+    id_to_name = roster.names
 
-    schedule_df = pd.DataFrame([
+    return pd.DataFrame([
         {
             'EmployeeID': emp_id,
             'Name': id_to_name.get(emp_id, "Unknown"),
@@ -271,6 +341,4 @@ def run_scheduler():
             'Locked': info.get('Locked', False)
         }
         for (emp_id, date), info in schedule_dict.items()
-    ])
-
-    save_schedule(schedule_df)
+    ], columns=['EmployeeID', 'Name', 'Date', 'Shift', 'Location', 'Locked'])
@@ -0,0 +1,49 @@
+import numpy as np
+
+# ----------------------------
+# Shift Definitions
+# ----------------------------
+# rules['shift_definitions'] lists every shift as [name, start, hours]:
+# the hour of day it starts and how long it runs, so a 12-hour shift is
+# [name, 7, 12] and a split shift is described by its first start and the
+# span to its last end. Shifts without a definition start at hour 0 and
+# last 0 hours, the same way the engine always treated unknown shifts.
+#
+# The next-day rules between two shifts only depend on the pair, so they
+# are precomputed once per run as shift x shift matrices:
+#
+#   cooldown             fewer than min_hours_between_shifts from the start
+#                        (or, with rest_from_shift_end, the end) of the
+#                        first shift to the start of the second
+#   morning_after_night  a shift running past midnight followed by one
+#                        starting before noon
+#
+# matrix[prev, next] is True when `next` may not be worked the day after
+# `prev`.
+
+def shift_table(rules):
+    return {name: (start, hours) for name, start, hours in rules['shift_definitions']}
+
+def shift_codes(shift_types, rules):
+    # shift_types first, then any other defined shift an existing assignment
+    # may carry, then None for everything else
+    shift_types = list(shift_types)
+    defined = [name for name, _, _ in rules['shift_definitions'] if name not in shift_types]
+    return shift_types + defined + [None]
+
+def conflict_matrices(code_names, rules):
+    table = shift_table(rules)
+    defined = np.array([name in table for name in code_names], dtype=bool)
+    start = np.array([table.get(name, (0, 0))[0] for name in code_names])
+    hours = np.array([table.get(name, (0, 0))[1] for name in code_names])
+
+    conflicts = {}
+    if rules['enforce_shift_cooldown']:
+        end = start + hours if rules['rest_from_shift_end'] else start
+        gap = 24 + start[None, :] - end[:, None]
+        conflicts['cooldown'] = gap < rules['min_hours_between_shifts']
+    if rules['enforce_no_morning_after_night']:
+        overnight = defined & (start + hours > 24)
+        morning = defined & (start < 12)
+        conflicts['morning_after_night'] = overnight[:, None] & morning[None, :]
+    return conflicts
@@ -0,0 +1,30 @@
+ANY = 'Any'
+
+# ----------------------------
+# Skill Requirements
+# ----------------------------
+# rules['skill_requirements'] lists minimum skill mixes as
+# [skill, shift, location, count] rows, e.g. ['Tech3', 'Night', 'Any', 1]
+# for at least one Tech3 on every Night shift in every zone. 'Any' matches
+# every shift or location; rows for the same skill and slot add up.
+# Employees count towards a requirement when their SkillLevel matches
+# exactly. Skilled staff are placed within max_staff_per_shift, never on
+# top of it.
+
+def required_skills(rules):
+    return sorted({skill for skill, _, _, _ in rules['skill_requirements']})
+
+def slot_requirements(rules, locations, shift_types):
+    # {(l, s): [(k, count), ...]} with k indexing required_skills(rules)
+    skills = {skill: k for k, skill in enumerate(required_skills(rules))}
+    needs = {}
+    for skill, shift, location, count in rules['skill_requirements']:
+        for l, loc in enumerate(locations):
+            if location not in (ANY, loc):
+                continue
+            for s, name in enumerate(shift_types):
+                if shift not in (ANY, name):
+                    continue
+                slot = needs.setdefault((l, s), {})
+                slot[skills[skill]] = slot.get(skills[skill], 0) + int(count)
+    return {slot: sorted(counts.items()) for slot, counts in needs.items()}
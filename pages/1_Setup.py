@@ -1,9 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
 from datetime import date
-from modules.employee_generator import generate_employees
-from modules.db_manager import load_employees
-from modules import scheduler_engine
+from modules.employee_generator import generate_employees, generate_employees_bulk, SKILL_LEVELS
+from modules.db_manager import load_employees, load_schedule
+from modules.config import SchedulerConfig, get_session_config, set_session_config
+from modules.skills import ANY
+
+PREVIEW_ROWS = 1000
 
 st.markdown("---")
 st.title("Setup & Configuration")
@@ -15,20 +19,37 @@ st.markdown("---")
 st.session_state.setdefault("holiday_buffer", [])
 st.session_state.setdefault("locked_locations", [])
 
+# Widgets edit a plain copy of this session's rules; it is frozen back into
+# the session's SchedulerConfig once all rule widgets have run
+rules = get_session_config().to_dict()
+
 # ----------------------------
 # Employee Generation
 # ----------------------------
 with st.expander("EMPLOYEE GENERATOR", expanded=True):
     st.markdown("---")
-    num_employees = st.slider("Number of employees", 5, 100, value=30)
+    bulk = st.checkbox(
+        "Bulk mode",
+        help="Vectorized generator for load tests: streams the roster to storage in chunks, names from a small pool"
+    )
+    if bulk:
+        num_employees = st.number_input("Number of employees", 100, 500000, value=10000, step=1000)
+    else:
+        num_employees = st.slider("Number of employees", 5, 100, value=30)
     if st.button("Generate Employees"):
-        df = generate_employees(n=num_employees)
+        if bulk:
+            generate_employees_bulk(num_employees, config=get_session_config())
+            df = load_employees()
+        else:
+            df = generate_employees(n=num_employees, config=get_session_config())
         st.success(f"{num_employees} employees generated.")
     else:
         df = load_employees()
 
     st.subheader("Employee Preview")
-    st.dataframe(df, use_container_width=True)
+    if len(df) > PREVIEW_ROWS:
+        st.caption(f"Showing the first {PREVIEW_ROWS} of {len(df)} employees.")
+    st.dataframe(df.head(PREVIEW_ROWS), use_container_width=True)
 
 # ----------------------------
 # Global Parameters
@@ -39,29 +60,68 @@ st.markdown("---")
 
 with st.expander("GLOBAL SCHEDULING PARAMETERS", expanded=False):
     st.markdown("---")
-    scheduler_engine.RULES['schedule_days'] = st.slider(
-        "Schedule length (days)", 1, 30, scheduler_engine.RULES['schedule_days'])
+    rules['schedule_days'] = st.slider(
+        "Schedule length (days)", 1, 90, rules['schedule_days'])
+
+    rules['rolling_horizon'] = st.checkbox(
+        "Rolling weekly horizon", rules['rolling_horizon'],
+        help="Schedule one ISO week at a time and apply the shift cap per week instead of per schedule"
+    )
+
+    # Shift definitions: start hour and length per shift; cooldown and
+    # morning-after-night conflicts are derived from these
+    shift_df = st.data_editor(
+        pd.DataFrame(rules['shift_definitions'], columns=["Shift", "Start", "Hours"]),
+        num_rows="dynamic",
+        column_config={
+            "Start": st.column_config.NumberColumn(min_value=0, max_value=23, step=1),
+            "Hours": st.column_config.NumberColumn(min_value=1, max_value=24, step=1)
+        },
+        hide_index=True,
+        key="shift_definitions_editor"
+    )
+    shift_df = shift_df.dropna().drop_duplicates("Shift")
+    rules['shift_definitions'] = [
+        [str(row.Shift), int(row.Start), int(row.Hours)] for row in shift_df.itertuples() if str(row.Shift).strip()
+    ]
+    shift_names = [name for name, _, _ in rules['shift_definitions']]
 
-    scheduler_engine.RULES['shift_types'] = st.multiselect(
-        "Shift types", ["Morning", "Afternoon", "Night"],
-        default=scheduler_engine.RULES['shift_types']
+    rules['shift_types'] = st.multiselect(
+        "Shift types", shift_names,
+        default=[shift for shift in rules['shift_types'] if shift in shift_names]
     )
 
-    scheduler_engine.RULES['active_locations'] = st.multiselect(
+    rules['active_locations'] = st.multiselect(
         "Active locations", ["ZoneA", "ZoneB", "ZoneC"],
-        default=scheduler_engine.RULES['active_locations']
+        default=rules['active_locations']
     )
 
     min_staff, max_staff = st.slider(
         "Employees per shift (min/max)", 1, 10,
-        value=(scheduler_engine.RULES['min_staff_threshold'], scheduler_engine.RULES['max_staff_per_shift'])
+        value=(rules['min_staff_threshold'], rules['max_staff_per_shift'])
+    )
+    rules['min_staff_threshold'] = min_staff
+    rules['max_staff_per_shift'] = max_staff
+
+    # The cap covers one ISO week in rolling mode, else the whole schedule
+    cap_days = 7 if rules['rolling_horizon'] else max(rules['schedule_days'], 7)
+    rules['max_shifts_per_employee'] = st.slider(
+        "Max shifts per employee (per week)" if rules['rolling_horizon'] else "Max shifts per employee (per schedule)",
+        1, cap_days,
+        value=min(rules['max_shifts_per_employee'], cap_days)
+    )
+
+    max_workers = max(os.cpu_count() or 1, 2)
+    rules['parallel_workers'] = st.slider(
+        "Parallel workers", 1, max_workers,
+        value=min(rules['parallel_workers'], max_workers),
+        help="Independent location groups (strict location preferences) are scheduled in separate processes"
     )
-    scheduler_engine.RULES['min_staff_threshold'] = min_staff
-    scheduler_engine.RULES['max_staff_per_shift'] = max_staff
 
-    scheduler_engine.RULES['max_shifts_per_employee'] = st.slider(
-        "Max shifts per employee (per week)", 1, 7,
-        value=scheduler_engine.RULES['max_shifts_per_employee']
+    rules['rebalance_seconds'] = st.slider(
+        "Rebalancing time budget (seconds)", 0, 30,
+        value=rules['rebalance_seconds'],
+        help="After scheduling, spend up to this long moving and swapping shifts to even out workload (0 = off)"
     )
 
 # ----------------------------
@@ -69,24 +129,24 @@ with st.expander("GLOBAL SCHEDULING PARAMETERS", expanded=False):
 # ----------------------------
 with st.expander("PREFERENCES & CORE ASSIGNMENT RULES", expanded=False):
     st.markdown("---")
-    scheduler_engine.RULES['enforce_work_pattern'] = st.checkbox(
-        "Respect Employee Availability", scheduler_engine.RULES['enforce_work_pattern'])
-    scheduler_engine.RULES['enforce_no_morning_after_night'] = st.checkbox(
-        "Enforce no Morning After Night", scheduler_engine.RULES['enforce_no_morning_after_night'])
-    scheduler_engine.RULES['use_seniority_weighting'] = st.checkbox(
-        "Use Seniority Weighting", scheduler_engine.RULES['use_seniority_weighting'])
-
-    scheduler_engine.RULES['shift_preference_mode'] = st.radio(
+    rules['enforce_work_pattern'] = st.checkbox(
+        "Respect Employee Availability", rules['enforce_work_pattern'])
+    rules['enforce_no_morning_after_night'] = st.checkbox(
+        "Enforce no Morning After Night", rules['enforce_no_morning_after_night'])
+    rules['use_seniority_weighting'] = st.checkbox(
+        "Use Seniority Weighting", rules['use_seniority_weighting'])
+
+    rules['shift_preference_mode'] = st.radio(
         "Preferred Shift Handling",
         options=["strict", "soft", "ignore"],
-        index=["strict", "soft", "ignore"].index(scheduler_engine.RULES['shift_preference_mode']),
+        index=["strict", "soft", "ignore"].index(rules['shift_preference_mode']),
         help="Strict = Required, Soft = Prefer, Ignore = No Preference"
     )
 
-    scheduler_engine.RULES['location_preference_mode'] = st.radio(
+    rules['location_preference_mode'] = st.radio(
         "Preferred Location Handling",
         options=["strict", "soft", "ignore"],
-        index=["strict", "soft", "ignore"].index(scheduler_engine.RULES.get('location_preference_mode', 'soft')),
+        index=["strict", "soft", "ignore"].index(rules.get('location_preference_mode', 'soft')),
         help="Strict = Required, Soft = Prefer, Ignore = No Preference"
     )
 
@@ -95,15 +155,111 @@ with st.expander("PREFERENCES & CORE ASSIGNMENT RULES", expanded=False):
 # ----------------------------
 with st.expander("CONSTRAINTS & COOLDOWNS", expanded=False):
     st.markdown("---")
-    scheduler_engine.RULES['enforce_consecutive_day_limit'] = st.checkbox(
-        "Limit Consecutive Workdays", scheduler_engine.RULES['enforce_consecutive_day_limit'])
-    scheduler_engine.RULES['max_consecutive_days'] = st.slider(
-        "Max Consecutive Days", 1, 10, scheduler_engine.RULES['max_consecutive_days'])
+    rules['enforce_consecutive_day_limit'] = st.checkbox(
+        "Limit Consecutive Workdays", rules['enforce_consecutive_day_limit'])
+    rules['max_consecutive_days'] = st.slider(
+        "Max Consecutive Days", 1, 10, rules['max_consecutive_days'])
+
+    rules['enforce_shift_cooldown'] = st.checkbox(
+        "Enforce Shift Cooldown", rules['enforce_shift_cooldown'])
+    rules['min_hours_between_shifts'] = st.slider(
+        "Cooldown Hours Between Shifts", 1, 24, rules['min_hours_between_shifts'])
+    rules['rest_from_shift_end'] = st.checkbox(
+        "Measure Cooldown From Shift End", rules['rest_from_shift_end'],
+        help="Count cooldown hours from the end of the previous shift instead of its start"
+    )
+
+# ----------------------------
+# Skill Requirements
+# ----------------------------
+with st.expander("SKILL REQUIREMENTS", expanded=False):
+    st.markdown("---")
+    st.markdown("Minimum number of employees with a given skill level per shift and location.")
+    any_option = [ANY]
+    skill_df = st.data_editor(
+        pd.DataFrame(rules['skill_requirements'], columns=["Skill", "Shift", "Location", "Count"]),
+        num_rows="dynamic",
+        column_config={
+            "Skill": st.column_config.SelectboxColumn(options=SKILL_LEVELS, required=True),
+            "Shift": st.column_config.SelectboxColumn(options=any_option + rules['shift_types'], default=ANY),
+            "Location": st.column_config.SelectboxColumn(options=any_option + rules['active_locations'], default=ANY),
+            "Count": st.column_config.NumberColumn(min_value=1, max_value=10, step=1, default=1)
+        },
+        hide_index=True,
+        key="skill_requirements_editor"
+    )
+    rules['skill_requirements'] = [
+        [row.Skill, row.Shift, row.Location, int(row.Count)] for row in skill_df.dropna().itertuples()
+    ]
+
+config = set_session_config(SchedulerConfig(**rules))
+
+# ----------------------------
+# What-if Scenarios
+# ----------------------------
+SCENARIO_RULES = [
+    'min_staff_threshold', 'max_staff_per_shift', 'max_shifts_per_employee',
+    'min_hours_between_shifts', 'max_consecutive_days',
+    'shift_preference_mode', 'location_preference_mode', 'rolling_horizon'
+]
+
+with st.expander("WHAT-IF SCENARIOS", expanded=False):
+    st.markdown("---")
+    st.markdown("Compare rule variants side by side. Each row is scheduled in parallel against the current "
+                "employees; the saved schedule is not changed.")
+
+    if "scenario_table" not in st.session_state:
+        current = {rule: config[rule] for rule in SCENARIO_RULES}
+        st.session_state.scenario_table = pd.DataFrame([
+            {'Scenario': 'Current', **current},
+            {'Scenario': 'Min 2 per shift', **current, 'min_staff_threshold': 2},
+            {'Scenario': 'Strict locations', **current, 'location_preference_mode': 'strict'}
+        ])
+
+    modes = ["strict", "soft", "ignore"]
+    scenario_df = st.data_editor(
+        st.session_state.scenario_table,
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            'shift_preference_mode': st.column_config.SelectboxColumn(options=modes),
+            'location_preference_mode': st.column_config.SelectboxColumn(options=modes)
+        },
+        key="scenario_editor"
+    )
+
+    if st.button("Run Scenarios"):
+        scenarios = {}
+        renamed = []
+        for i, row in scenario_df.dropna(how='all').reset_index(drop=True).iterrows():
+            overrides = {}
+            for rule in SCENARIO_RULES:
+                if pd.isna(row[rule]):
+                    continue
+                overrides[rule] = type(config[rule])(row[rule])
+            name = "" if pd.isna(row['Scenario']) else str(row['Scenario']).strip()
+            name = name or f"Scenario {i + 1}"
+            # Results are keyed by name, so a repeated name gets a suffix
+            # instead of replacing the earlier row
+            unique, n = name, 2
+            while unique in scenarios:
+                unique, n = f"{name} ({n})", n + 1
+            if unique != name:
+                renamed.append(f"{name} -> {unique}")
+            scenarios[unique] = overrides
+        if renamed:
+            st.warning("Duplicate scenario names were renamed: " + ", ".join(renamed))
+
+        if load_employees().empty:
+            st.warning("Generate employees first.")
+        elif scenarios:
+            # The engine is only imported once a run is requested
+            from modules.scheduler_engine import run_what_if
+            with st.spinner(f"Running {len(scenarios)} scenario(s)..."):
+                st.session_state.scenario_results = run_what_if(scenarios, config)
 
-    scheduler_engine.RULES['enforce_shift_cooldown'] = st.checkbox(
-        "Enforce Shift Cooldown", scheduler_engine.RULES['enforce_shift_cooldown'])
-    scheduler_engine.RULES['min_hours_between_shifts'] = st.slider(
-        "Cooldown Hours Between Shifts", 1, 24, scheduler_engine.RULES['min_hours_between_shifts'])
+    if st.session_state.get("scenario_results") is not None:
+        st.dataframe(st.session_state.scenario_results, use_container_width=True)
 
 # ----------------------------
 # Holiday Logic
@@ -117,7 +273,12 @@ with st.expander("COMPANY-WIDE HOLIDAYS", expanded=False):
         str_date = new_holiday.strftime('%Y-%m-%d')
         if str_date not in st.session_state.holiday_buffer:
             st.session_state.holiday_buffer.append(str_date)
-            st.success(f"Added: {str_date}")
+            if not load_schedule().empty:
+                from modules.scheduler_engine import run_incremental
+                removed, added, config = run_incremental({'holidays': [str_date]}, config)
+                st.success(f"Added: {str_date} (rescheduled {len(removed)} assignment(s), added {len(added)})")
+            else:
+                st.success(f"Added: {str_date}")
         else:
             st.warning("Date already added.")
 
@@ -129,4 +290,4 @@ with st.expander("COMPANY-WIDE HOLIDAYS", expanded=False):
         if st.button("Clear All Holidays"):
             st.session_state.holiday_buffer = []
 
-    scheduler_engine.RULES['holiday_dates'] = st.session_state.holiday_buffer
+    set_session_config(get_session_config().replace(holiday_dates=st.session_state.holiday_buffer))
@@ -1,21 +1,84 @@
 # 2_Schedule.py
+import json
 import streamlit as st
 import pandas as pd
-from modules.scheduler_engine import run_scheduler, RULES
-from modules.db_manager import load_schedule, load_employees
+from modules.diagnostics import RunProfile
+from modules.jobs import submit, get_job
+from modules.analytics import schedule_analytics, coverage_styles
+from modules.config import get_session_config
+from modules.db_manager import load_schedule, load_roster
 
 st.title("Schedule & Logistics")
+config = get_session_config()
 
 # ----------------------------
 # Scheduler Controls
 # ----------------------------
 st.markdown("---")
 with st.expander("View Active Rules", expanded=False):
-    st.json(RULES, expanded=False)
+    st.json(config.to_dict(), expanded=False)
 
-if st.button("Run Scheduler"):
-    run_scheduler()
-    st.success("Schedule generated")
+solver_col, limit_col = st.columns(2)
+solver = solver_col.selectbox(
+    "Solver", ["greedy", "milp"],
+    help="Greedy = fast heuristic passes, MILP = optimize all rules at once (time-limited)"
+)
+time_limit = limit_col.number_input("MILP time limit (seconds)", 5, 600, value=30, disabled=solver != "milp")
+collect_diagnostics = st.checkbox(
+    "Collect diagnostics",
+    help="Record per-phase timings and which rules rejected candidates (slower run)"
+)
+cache_col, warm_col = st.columns(2)
+use_cache = cache_col.checkbox(
+    "Reuse cached results", value=True,
+    help="Load the stored schedule when the roster, rules, start date and solver are unchanged"
+)
+warm_start = warm_col.checkbox(
+    "Warm-start from last run",
+    help="Keep the still-valid assignments of the latest cached run of this roster and fill the rest"
+)
+
+# Runs go to a background job; the fragment below polls it, and the stored
+# schedule is only replaced once the job finishes
+running = 'scheduler_job' in st.session_state
+if st.button("Run Scheduler", disabled=running):
+    # The engine is only imported once a run or edit is requested
+    from modules.scheduler_engine import run_scheduler
+    profile = RunProfile() if collect_diagnostics else None
+    job_id = submit(
+        run_scheduler, config, solver=solver, time_limit=time_limit, profile=profile,
+        use_cache=use_cache, warm_start=warm_start
+    )
+    st.session_state.scheduler_job = (job_id, profile)
+    running = True
+
+@st.fragment(run_every=0.5)
+def scheduler_job_status():
+    job_id, profile = st.session_state.scheduler_job
+    job = get_job(job_id)
+    if job is not None and job.running:
+        phase = (job.phase or "starting").capitalize()
+        st.progress(job.fraction, text=f"{phase} {job.done}/{job.total} ({job.elapsed:.1f}s)")
+        if st.button("Cancel Run"):
+            job.cancel()
+        return
+
+    del st.session_state.scheduler_job
+    if job is None or job.status == 'cancelled':
+        st.session_state.job_message = ('warning', "Run cancelled; the previous schedule was kept.")
+    elif job.status == 'failed':
+        st.session_state.job_message = ('error', f"Scheduler failed: {job.error}")
+    else:
+        st.session_state.run_profile = profile.to_dict() if profile else None
+        text = "Schedule loaded from cache" if job.result else f"Schedule generated in {job.elapsed:.1f}s"
+        st.session_state.job_message = ('success', text)
+    st.rerun()
+
+if running:
+    scheduler_job_status()
+if 'job_message' in st.session_state:
+    kind, text = st.session_state.pop('job_message')
+    getattr(st, kind)(text)
 
 schedule_df = load_schedule()
 
@@ -23,8 +86,44 @@ if schedule_df.empty:
     st.warning("No schedule found. Please run the scheduler.")
     st.stop()
 
+# ----------------------------
+# Call-outs & Locks
+# ----------------------------
+with st.expander("CALL-OUTS & LOCKS", expanded=False):
+    st.markdown("Apply a single change and re-solve only the days it can affect.")
+    schedule_dates = sorted(schedule_df['Date'].dt.strftime('%Y-%m-%d').unique())
+    staff = schedule_df.drop_duplicates('EmployeeID').set_index('EmployeeID')['Name'].to_dict()
+
+    callout_col, lock_col = st.columns(2)
+    with callout_col:
+        st.subheader("Call-out")
+        callout_emp = st.selectbox("Employee", sorted(staff), format_func=lambda e: f"{staff[e]} ({e})", key="callout_emp")
+        callout_day = st.selectbox("Date", schedule_dates, key="callout_day")
+        if st.button("Apply Call-out"):
+            from modules.scheduler_engine import run_incremental
+            removed, added, _ = run_incremental({'unavailable': {callout_emp: [callout_day]}}, config)
+            st.success(f"Removed {len(removed)} assignment(s), added {len(added)}.")
+            schedule_df = load_schedule()
+
+    with lock_col:
+        st.subheader("Lock Assignment")
+        lock_emp = st.selectbox("Employee", sorted(staff), format_func=lambda e: f"{staff[e]} ({e})", key="lock_emp")
+        lock_day = st.selectbox("Date", schedule_dates, key="lock_day")
+        lock_location = st.selectbox("Location", config['active_locations'], key="lock_location")
+        lock_shift = st.selectbox("Shift", config['shift_types'], key="lock_shift")
+        if st.button("Lock Assignment"):
+            from modules.scheduler_engine import run_incremental
+            removed, added, _ = run_incremental({'locks': [{
+                'EmployeeID': lock_emp, 'Date': lock_day,
+                'Shift': lock_shift, 'Location': lock_location
+            }]}, config)
+            st.success(f"Locked. Removed {len(removed)} assignment(s), added {len(added)}.")
+            schedule_df = load_schedule()
+
+analytics = schedule_analytics(schedule_df, load_roster(), config)
+
 st.markdown("---")
-tab1, tab2, tab3 = st.tabs(["| Schedule |", "| Logistics |", "| Underscheduled |"])
+tab1, tab2, tab3, tab4 = st.tabs(["| Schedule |", "| Logistics |", "| Underscheduled |", "| Diagnostics |"])
 
 # ----------------------------
 # Tab 1 - Schedule Viewer
@@ -54,38 +153,45 @@ with tab2:
     st.markdown("---")
     st.subheader("Per-Location Daily Shift Coverage")
 
-    min_req = RULES.get('min_staff_threshold', 3)
-    shift_types = RULES.get("shift_types", [])
-
-    coverage_grid = (
-        schedule_df
-        .groupby(['Date', 'Location', 'Shift'])['EmployeeID']
-        .count()
-        .reset_index()
-        .pivot_table(index=['Date', 'Location'], columns='Shift', values='EmployeeID', fill_value=0)
-        .reset_index()
-    )
-
-    for shift in shift_types:
-        if shift not in coverage_grid.columns:
-            coverage_grid[shift] = 0
-    coverage_grid[shift_types] = coverage_grid[shift_types].astype(int)
-    coverage_grid = coverage_grid[['Date', 'Location'] + shift_types]
+    min_req = config.get('min_staff_threshold', 3)
+    shift_types = list(config.get("shift_types", []))
+    summary = analytics['summary']
 
-    def highlight_shift(val):
-        try:
-            return 'background-color: #99ccff' if val < min_req else 'background-color: #666699'
-        except:
-            return ''
+    slots_col, short_col, loc_col, shift_col = st.columns(4)
+    slots_col.metric("Slots Covered", f"{summary['coverage_rate']:.0%}")
+    short_col.metric("Understaffed Slots", summary['understaffed_slots'])
+    loc_col.metric("Location Preference Hits", f"{summary['location_hit_rate']:.0%}")
+    shift_col.metric("Shift Preference Hits", f"{summary['shift_hit_rate']:.0%}")
 
+    coverage_grid = analytics['coverage']
     styled = (
         coverage_grid.style
-        .applymap(highlight_shift, subset=shift_types)
-        .format({shift: "{:.0f}" for shift in shift_types})
+        .apply(coverage_styles, axis=None, shift_types=shift_types, min_staff=min_req)
+        .format({'Date': lambda d: d.strftime('%Y-%m-%d')})
     )
 
     st.dataframe(styled, use_container_width=True)
 
+    understaffed_slots = analytics['understaffed']
+    if not understaffed_slots.empty:
+        with st.expander(f"Understaffed slots ({len(understaffed_slots)})", expanded=False):
+            st.dataframe(understaffed_slots, use_container_width=True)
+
+    st.subheader("Skill Mix per Shift")
+    skill_short = analytics['skill_short']
+    if config['skill_requirements']:
+        if skill_short.empty:
+            st.success("Every skill requirement is met.")
+        else:
+            st.warning(f"{summary['skill_shortfall']} required skilled shift(s) missing.")
+    st.dataframe(
+        analytics['skill_mix'].style.format({'Date': lambda d: d.strftime('%Y-%m-%d')}),
+        use_container_width=True
+    )
+    if not skill_short.empty:
+        with st.expander(f"Slots missing a required skill ({len(skill_short)})", expanded=False):
+            st.dataframe(skill_short, use_container_width=True)
+
 # ----------------------------
 # Tab 3 - Underscheduled Employees
 # ----------------------------
@@ -93,17 +199,60 @@ with tab3:
     st.markdown("---")
     st.subheader("Employees Below Max Weekly Shifts")
 
-    employees_df = load_employees()
-    employees_df['ScheduledShifts'] = employees_df['Name'].apply(
-        lambda eid: (schedule_df['Name'] == eid).sum()
-    )
-
-    max_allowed = RULES.get('max_shifts_per_employee', 5)
-    underscheduled = employees_df[employees_df['ScheduledShifts'] < max_allowed].copy()
+    employees_df = analytics['utilization']
+    underscheduled = employees_df[employees_df['ScheduledShifts'] < employees_df['MaxShifts']]
 
     if underscheduled.empty:
         st.success("All employees have been fully utilized.")
     else:
-        underscheduled = underscheduled[['EmployeeID', 'Name', 'ScheduledShifts']]
+        underscheduled = underscheduled[['EmployeeID', 'Name', 'ScheduledShifts', 'MaxShifts', 'Utilization']]
         underscheduled = underscheduled.sort_values(by='ScheduledShifts')
         st.dataframe(underscheduled.reset_index(drop=True), use_container_width=True)
+
+# ----------------------------
+# Tab 4 - Run Diagnostics
+# ----------------------------
+with tab4:
+    st.markdown("---")
+    st.subheader("Scheduler Run Diagnostics")
+
+    run_profile = st.session_state.get('run_profile')
+    if not run_profile:
+        st.info("Tick 'Collect diagnostics' and run the scheduler to see where time and candidates go.")
+    else:
+        phases_df = pd.DataFrame([
+            {
+                'Phase': name,
+                'Wall Time (s)': round(stats['wall_time'], 4),
+                'Candidate Calls': stats['calls'],
+                'Candidates Evaluated': stats['candidates_evaluated'],
+                'Assigned': stats['assigned']
+            }
+            for name, stats in run_profile['phases'].items()
+        ])
+        st.dataframe(phases_df, use_container_width=True)
+
+        rejections_df = pd.DataFrame([
+            {'Phase': name, 'Rule': rule, 'Rejections': count}
+            for name, stats in run_profile['phases'].items()
+            for rule, count in stats['rejections'].items()
+        ])
+        if not rejections_df.empty:
+            st.markdown("**Rejections by rule**")
+            st.bar_chart(rejections_df.pivot_table(index='Rule', columns='Phase', values='Rejections', fill_value=0))
+
+        slots_df = pd.json_normalize(run_profile['slots']).fillna(0)
+        if not slots_df.empty:
+            st.markdown("**Rejections by slot**")
+            slots_df.columns = [col.replace('rejections.', '') for col in slots_df.columns]
+            short_only = st.checkbox("Only slots left below the minimum", value=False)
+            if short_only:
+                slots_df = slots_df[slots_df['staffed'] < config['min_staff_threshold']]
+            st.dataframe(slots_df, use_container_width=True)
+
+        st.download_button(
+            "Download diagnostics (JSON)",
+            data=json.dumps(run_profile, indent=2),
+            file_name="scheduler_diagnostics.json",
+            mime="application/json"
+        )
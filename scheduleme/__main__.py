@@ -0,0 +1,86 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from modules.batch import FORMATS, load_rules, load_sites, run_sites, site_name
+from modules.config import parse_rule
+from modules.scheduler_engine import SOLVERS
+
+# ----------------------------
+# Batch CLI
+# ----------------------------
+# Schedules one or more sites without starting the app:
+#
+#   python -m scheduleme north_employees.csv south_employees.csv --rules rules.json --out results
+#   python -m scheduleme --sites sites.json --workers 4 --format parquet --out results
+#
+# Prints one timing line per site as it finishes. --report writes every
+# site's timings and quality summary as JSON.
+
+def parse_date(text):
+    return datetime.strptime(text, '%Y-%m-%d')
+
+def print_result(result):
+    timings = result['timings']
+    quality = result['quality']
+    line = (
+        f"{result['site']:>12}  {result['employees']:>6} emp {result['days']:>3} days | "
+        f"load {timings['load']:.3f}s  solve {timings['solve']:.3f}s"
+    )
+    if 'write' in timings:
+        line += f"  write {timings['write']:.3f}s"
+    line += (
+        f" | assignments {result['assignments']}  unfilled {quality['unfilled_slots']}"
+        f"  violations {quality['total_violations']}"
+    )
+    if result['output']:
+        line += f" -> {result['output']}"
+    print(line, flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scheduleme', description="Schedule sites from roster files.")
+    parser.add_argument('rosters', nargs='*', help="roster files (.csv, .parquet or .json), one site each")
+    parser.add_argument('--sites', help="JSON manifest of sites: [{name, roster, rules}]")
+    parser.add_argument('--rules', help="JSON file of rule overrides shared by the roster arguments")
+    parser.add_argument('--rule', action='append', default=[], metavar='KEY=VALUE',
+                        help="override a scheduler rule, value parsed as JSON (repeatable)")
+    parser.add_argument('--out', help="output directory; without it schedules are only scored")
+    parser.add_argument('--format', choices=FORMATS, default='csv', help="output format")
+    parser.add_argument('--solver', choices=SOLVERS, default='greedy')
+    parser.add_argument('--time-limit', type=int, default=30, help="MILP time limit in seconds")
+    parser.add_argument('--start', type=parse_date, help="first schedule day, YYYY-MM-DD (default today)")
+    parser.add_argument('--workers', type=int, default=1, help="sites scheduled in parallel processes")
+    parser.add_argument('--report', help="write per-site timings and quality as JSON to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = dict(parse_rule(text) for text in args.rule)
+        config = load_rules(args.rules, **overrides)
+        sites = [(site_name(path), path, config) for path in args.rosters]
+        if args.sites:
+            sites += [
+                (name, path, rules.replace(**overrides) if rules is not None else config)
+                for name, path, rules in load_sites(args.sites)
+            ]
+    except ValueError as e:
+        parser.error(f"bad rules: {e}")
+    if not sites:
+        parser.error("no sites given; pass roster files or --sites")
+
+    start = time.perf_counter()
+    results = run_sites(
+        sites, workers=args.workers, callback=print_result, out=args.out, fmt=args.format,
+        solver=args.solver, time_limit=args.time_limit, start_date=args.start
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{len(results)} site(s) in {elapsed:.3f}s", flush=True)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'elapsed': elapsed, 'results': results}, f, indent=2, default=str)
+    return results
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
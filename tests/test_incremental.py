@@ -0,0 +1,73 @@
+from datetime import datetime
+from benchmarks.workloads import make_workload
+from modules.incremental import apply_changes
+from modules.quality import evaluate_schedule
+from modules.scheduler_engine import solve_schedule
+
+# ----------------------------
+# Incremental Re-scheduling
+# ----------------------------
+# apply_changes() drops the assignments a call-out or lock breaks, refills
+# the affected window and never moves a locked assignment.
+
+START = datetime(2030, 1, 7)
+
+def solved(min_staff=2):
+    workload = make_workload(100, 7, 3, rules={'min_staff_threshold': min_staff}, start=START)
+    config = workload['rules']
+    schedule = solve_schedule(workload['roster'], workload['schedule_days'], config)
+    return workload, config, schedule
+
+def apply(workload, config, schedule, changes):
+    return apply_changes(
+        workload['roster'], schedule, config['shift_types'], config['active_locations'], config, changes
+    )
+
+def quality(workload, config, schedule):
+    return evaluate_schedule(
+        schedule, workload['roster'], workload['schedule_days'],
+        config['shift_types'], config['active_locations'], config
+    )
+
+def test_call_out_is_dropped_and_refilled():
+    workload, config, schedule = solved()
+    (emp_id, date), info = next(iter(schedule.items()))
+    before = schedule.slot_count(date, info['Location'], info['Shift'])
+
+    schedule, removed, added = apply(workload, config, schedule, {
+        'unavailable': {emp_id: [date.strftime('%Y-%m-%d')]}
+    })
+    assert [key for key, _ in removed] == [(emp_id, date)]
+    assert (emp_id, date) not in schedule
+    assert schedule.slot_count(date, info['Location'], info['Shift']) >= min(before, config['min_staff_threshold'])
+    assert quality(workload, config, schedule)['total_violations'] == 0
+
+def test_call_out_outside_horizon_changes_nothing():
+    workload, config, schedule = solved()
+    before = dict(schedule.items())
+    emp_id = next(iter(schedule.keys()))[0]
+    schedule, removed, added = apply(workload, config, schedule, {'unavailable': {emp_id: ['1999-01-01']}})
+    assert removed == [] and added == []
+    assert dict(schedule.items()) == before
+
+def test_lock_is_kept_and_slot_stays_within_cap():
+    workload, config, schedule = solved()
+    date = workload['schedule_days'][2]
+    location, shift = config['active_locations'][0], config['shift_types'][0]
+    # Someone not already working that slot
+    emp_id = next(
+        e.emp_id for e in workload['roster']
+        if schedule.get((e.emp_id, date), {}).get('Location') != location
+    )
+    lock = {'EmployeeID': emp_id, 'Date': date.strftime('%Y-%m-%d'), 'Shift': shift, 'Location': location}
+
+    schedule, removed, added = apply(workload, config, schedule, {'locks': [lock]})
+    assert schedule[(emp_id, date)] == {'Shift': shift, 'Location': location, 'Locked': True}
+    assert schedule.slot_count(date, location, shift) <= config['max_staff_per_shift']
+
+    # A later call-out or holiday never removes a locked assignment
+    day = date.strftime('%Y-%m-%d')
+    schedule, removed, _ = apply(workload, config, schedule, {'unavailable': {emp_id: [day]}, 'holidays': [day]})
+    assert schedule[(emp_id, date)]['Locked']
+    assert all(d != date or info['Locked'] for (_, d), info in schedule.items())
+    assert all(not info.get('Locked', False) for _, info in removed)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from benchmarks.workloads import make_workload
+from modules.parallel import find_partitions
+from modules.roster import Roster
+from modules.scheduler_engine import solve_schedule
+
+# ----------------------------
+# Partitioned Scheduling
+# ----------------------------
+# With strict location preferences each group of zones is scheduled in its
+# own process; the merged result must match a single-process run exactly.
+
+def strict_workload():
+    workload = make_workload(300, 14, 6, rules={'location_preference_mode': 'strict'},
+                             start=datetime(2030, 1, 7))
+    # One preferred zone per employee, so every zone is its own partition
+    df = workload['employees']
+    df['PreferredLocations'] = [locations[:1] for locations in df['PreferredLocations']]
+    workload['roster'] = Roster.from_dataframe(df)
+    return workload
+
+def test_partitioned_matches_serial():
+    workload = strict_workload()
+    roster, days, config = workload['roster'], workload['schedule_days'], workload['rules']
+    assert len(find_partitions(roster, config['active_locations'], config)) > 1
+
+    serial = solve_schedule(roster, days, config, workers=1)
+    partitioned = solve_schedule(roster, days, config, workers=2)
+    assert dict(partitioned.items()) == dict(serial.items())
+
+def test_soft_preferences_are_not_partitioned():
+    workload = strict_workload()
+    config = workload['rules'].replace(location_preference_mode='soft')
+    assert len(find_partitions(workload['roster'], config['active_locations'], config)) <= 1
@@ -0,0 +1,31 @@
+from benchmarks.workloads import PRESETS, make_workload
+from modules.quality import evaluate_schedule
+from modules.schedule_state import ScheduleState
+from modules.scheduler_engine import solve_schedule
+
+# ----------------------------
+# Greedy Schedule Quality
+# ----------------------------
+# The fill pass revisits days the first pass already staffed, so it must
+# not place a shift that clashes with the next day (Night before Morning,
+# cooldown) or stretches a run past max_consecutive_days.
+
+def greedy_quality(preset, **rules):
+    size = PRESETS[preset]
+    workload = make_workload(size['employees'], size['days'], size['locations'], rules=rules)
+    config = workload['rules']
+    schedule = solve_schedule(workload['roster'], workload['schedule_days'], config, existing=ScheduleState())
+    return evaluate_schedule(
+        schedule, workload['roster'], workload['schedule_days'],
+        config['shift_types'], config['active_locations'], config
+    )
+
+def test_small_preset_has_no_violations():
+    quality = greedy_quality('small')
+    assert quality['total_violations'] == 0, quality['violations']
+    assert quality['unfilled_slots'] == 0
+
+def test_fill_pass_respects_next_day():
+    # Two staff per slot is what used to leave Night->Morning pairs behind
+    quality = greedy_quality('medium', min_staff_threshold=2)
+    assert quality['total_violations'] == 0, quality['violations']
@@ -0,0 +1,79 @@
+import os
+from datetime import datetime
+import pytest
+from benchmarks.workloads import make_workload
+from modules import db_manager, result_cache
+from modules.result_cache import evict, get_result, put_result, result_key
+from modules.scheduler_engine import solve_schedule
+
+# ----------------------------
+# Result Cache
+# ----------------------------
+# Entries are keyed by roster, rules, start date, solver and warm start; a
+# change to any of them is a miss. Eviction drops the least recently used
+# files first, where a hit counts as a use.
+
+START = datetime(2030, 1, 7)
+
+@pytest.fixture
+def workload(tmp_path):
+    with db_manager.use_data_dir(str(tmp_path)):
+        yield make_workload(50, 7, 3, start=START)
+
+def solved(workload, config=None):
+    config = workload['rules'] if config is None else config
+    return solve_schedule(workload['roster'], workload['schedule_days'], config)
+
+def test_hit_returns_the_stored_schedule(workload):
+    roster, days, config = workload['roster'], workload['schedule_days'], workload['rules']
+    schedule = solved(workload)
+    assert get_result(roster.digest(), config, START, days, 'greedy') is None
+
+    put_result(roster.digest(), config, START, days, 'greedy', schedule)
+    cached = get_result(roster.digest(), config, START, days, 'greedy')
+    assert dict(cached.items()) == dict(schedule.items())
+
+def test_key_covers_every_input(workload):
+    digest, config = workload['roster'].digest(), workload['rules']
+    base = result_key(digest, config, START, 'greedy')
+    assert result_key(digest, config, START, 'greedy') == base
+    assert result_key('other', config, START, 'greedy') != base
+    assert result_key(digest, config.replace(min_staff_threshold=2), START, 'greedy') != base
+    assert result_key(digest, config.replace(rebalance_seconds=5), START, 'greedy') != base
+    assert result_key(digest, config, datetime(2030, 1, 8), 'greedy') != base
+    assert result_key(digest, config, START, 'milp', 30) != base
+    assert result_key(digest, config, START, 'milp', 30) != result_key(digest, config, START, 'milp', 60)
+    assert result_key(digest, config, START, 'greedy', warm_start=True) != base
+    # The time limit only matters to the MILP solver
+    assert result_key(digest, config, START, 'greedy', 60) == base
+
+def test_changed_inputs_miss(workload):
+    roster, days, config = workload['roster'], workload['schedule_days'], workload['rules']
+    put_result(roster.digest(), config, START, days, 'greedy', solved(workload))
+    assert get_result(roster.digest(), config.replace(min_staff_threshold=2), START, days, 'greedy') is None
+    assert get_result(roster.digest(), config, START, days, 'greedy', warm_start=True) is None
+
+    # A different roster has a different digest
+    other = make_workload(51, 7, 3, start=START)['roster']
+    assert get_result(other.digest(), config, START, days, 'greedy') is None
+
+def test_evict_drops_least_recently_used(workload):
+    roster, days, config = workload['roster'], workload['schedule_days'], workload['rules']
+    digest = roster.digest()
+    other = config.replace(min_staff_threshold=2)
+    first = put_result(digest, config, START, days, 'greedy', solved(workload))
+    second = put_result(digest, other, START, days, 'greedy', solved(workload, other))
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+
+    # Reading the older entry makes it the most recently used
+    assert get_result(digest, config, START, days, 'greedy') is not None
+    evict(max(os.path.getsize(first), os.path.getsize(second)))
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+
+def test_clear_results(workload):
+    roster, days, config = workload['roster'], workload['schedule_days'], workload['rules']
+    put_result(roster.digest(), config, START, days, 'greedy', solved(workload))
+    result_cache.clear_results()
+    assert get_result(roster.digest(), config, START, days, 'greedy') is None
@@ -0,0 +1,47 @@
+from datetime import datetime
+from benchmarks.workloads import make_workload
+from modules.quality import evaluate_schedule
+from modules.scheduler_engine import solve_schedule
+from modules.skills import ANY, slot_requirements
+
+# ----------------------------
+# Skill Requirements
+# ----------------------------
+# Every slot a requirement row matches must get its skilled staff, within
+# max_staff_per_shift, whichever solver pass fills it.
+
+START = datetime(2030, 1, 7)
+
+def skill_quality(requirements, enforce=True, **rules):
+    # enforce=False solves without the requirements but still scores them
+    workload = make_workload(100, 7, 3, rules=dict(rules, skill_requirements=requirements), start=START)
+    config = workload['rules']
+    solve_config = config if enforce else config.replace(skill_requirements=[])
+    schedule = solve_schedule(workload['roster'], workload['schedule_days'], solve_config)
+    return evaluate_schedule(
+        schedule, workload['roster'], workload['schedule_days'],
+        config['shift_types'], config['active_locations'], config
+    )
+
+def test_slot_requirements_expand_any_and_add_up():
+    rules = {'skill_requirements': [
+        ['Tech3', ANY, ANY, 1], ['Tech3', 'Night', 'ZoneB', 1], ['Tech2', 'Morning', ANY, 2]
+    ]}
+    needs = slot_requirements(rules, ['ZoneA', 'ZoneB'], ['Morning', 'Night'])
+    # Skills are indexed in sorted order: Tech2 = 0, Tech3 = 1
+    assert needs[(0, 0)] == [(0, 2), (1, 1)]
+    assert needs[(0, 1)] == [(1, 1)]
+    assert needs[(1, 1)] == [(1, 2)]
+
+def test_every_slot_gets_its_skill_mix():
+    requirements = [['Tech3', ANY, ANY, 1]]
+    # Left to chance, some slots miss out
+    assert skill_quality(requirements, enforce=False, min_staff_threshold=2)['skill_shortfall'] > 0
+    quality = skill_quality(requirements, min_staff_threshold=2)
+    assert quality['skill_shortfall'] == 0
+    assert quality['total_violations'] == 0, quality['violations']
+
+def test_shift_specific_requirement():
+    quality = skill_quality([['Tech1', 'Night', ANY, 1], ['Tech2', 'Night', ANY, 1]], min_staff_threshold=2)
+    assert quality['skill_shortfall'] == 0
+    assert quality['total_violations'] == 0, quality['violations']
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+from datetime import datetime
+from benchmarks.workloads import build_roster, make_workload
+from modules import db_manager
+from modules.roster import Roster
+from modules.scheduler_engine import schedule_to_dataframe, solve_schedule
+
+# ----------------------------
+# Storage Round-trips
+# ----------------------------
+# Both backends must hand back the roster and schedule they were given:
+# the same employee frame, the same parsed Roster and the same assignments.
+
+START = datetime(2030, 1, 7)
+
+def plain(values):
+    # List columns may come back as arrays
+    return [value if isinstance(value, str) else list(value) for value in values]
+
+@pytest.fixture(params=['sqlite', 'parquet'])
+def storage(request, tmp_path, monkeypatch):
+    if request.param == 'parquet':
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(db_manager, 'STORAGE', request.param)
+    db_manager.clear_cache()
+    with db_manager.use_data_dir(str(tmp_path)), db_manager.use_session('test'):
+        yield request.param
+    db_manager.clear_cache()
+
+def test_employees_round_trip(storage):
+    df = build_roster(50, 7, 3, start=START)
+    db_manager.save_employees(df)
+
+    loaded = db_manager.load_employees()
+    assert list(loaded.columns) == db_manager.EMPLOYEE_COLUMNS
+    assert pd.to_datetime(loaded['DateHired']).tolist() == pd.to_datetime(df['DateHired']).tolist()
+    for column in db_manager.EMPLOYEE_COLUMNS:
+        if column != 'DateHired':
+            assert plain(loaded[column]) == plain(df[column]), column
+
+    assert db_manager.load_roster().digest() == Roster.from_dataframe(df).digest()
+
+def test_schedule_round_trip(storage):
+    workload = make_workload(50, 7, 3, start=START)
+    db_manager.save_employees(workload['employees'])
+    schedule = solve_schedule(workload['roster'], workload['schedule_days'], workload['rules'])
+    df = schedule_to_dataframe(schedule, workload['roster'])
+    db_manager.save_schedule(df)
+
+    loaded = db_manager.load_schedule()
+    assert list(loaded.columns) == db_manager.SCHEDULE_COLUMNS
+    key = ['EmployeeID', 'Date']
+    expected = df[db_manager.SCHEDULE_COLUMNS].sort_values(key).reset_index(drop=True)
+    loaded = loaded.sort_values(key).reset_index(drop=True)
+    assert loaded['EmployeeID'].tolist() == expected['EmployeeID'].tolist()
+    assert loaded['Name'].tolist() == expected['Name'].tolist()
+    assert pd.to_datetime(loaded['Date']).tolist() == pd.to_datetime(expected['Date']).tolist()
+    assert loaded['Shift'].tolist() == expected['Shift'].tolist()
+    assert loaded['Location'].tolist() == expected['Location'].tolist()
+    assert loaded['Locked'].astype(bool).tolist() == expected['Locked'].astype(bool).tolist()
+
+def test_saving_again_replaces_the_schedule(storage):
+    workload = make_workload(50, 7, 3, start=START)
+    db_manager.save_employees(workload['employees'])
+    schedule = solve_schedule(workload['roster'], workload['schedule_days'], workload['rules'])
+    df = schedule_to_dataframe(schedule, workload['roster'])
+    db_manager.save_schedule(df)
+    assert len(db_manager.load_schedule()) == len(df)
+
+    db_manager.save_schedule(df.iloc[:10])
+    assert len(db_manager.load_schedule()) == 10